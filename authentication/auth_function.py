@@ -1,41 +1,40 @@
 from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Response, Request
+from fastapi import APIRouter, HTTPException, Depends, Response, Request
 from fastapi.responses import RedirectResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from passlib.context import CryptContext
 import traceback
-import requests
 import os
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
 
 from db_connection.db_provider import get_db
 from models.auth_model import SignUp, VerifyOTP, Login
 from models.user_model import User, Profile_Update
 from authentication.send_mail import generate_otp, send_mail_fast
-from db_connection.redis_function import save_data_redis, verify_otp_redis, get_saved_password, delete_data
-from utility.jwt_helper import create_access_token, create_refresh_token, verify_access_token, verify_refresh_token
-from utility.jti_helper import generate_jti, save_jti, create_session, validate_jti, rotate_jti, get_jti_session, delete_jti
+from authentication.password_pool import hash_password_async, verify_password_async
+from db_connection.redis_function import consume_pending_signup
+from utility.jwt_helper import create_access_token, create_refresh_token, verify_access_token_cached, verify_refresh_token
+from utility.jti_helper import generate_jti, save_jti, create_session, rotate_jti, delete_jti, list_sessions, revoke_all_sessions
 from utility.url_helper import generate_otp_context_token, get_email_url
+from utility.rate_limiter import enforce_rate_limit
 
 router = APIRouter()
 bearer_scheme = HTTPBearer(auto_error=False)
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 ACCESS_COOKIE_NAME = "access_token"
 REFRESH_COOKIE_NAME = "refresh_token"
 IS_PROD = False
 COOKIE_SAMESITE = "lax" if not IS_PROD else "strict"
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    return await hash_password_async(password)
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await verify_password_async(plain_password, hashed_password)
 
 
 
 @router.post("/signup")
-async def signup(data: SignUp, background_task:BackgroundTasks, db = Depends(get_db)):
+async def signup(data: SignUp, request: Request, db = Depends(get_db)):
+    # Before any Mongo or bcrypt work
+    await enforce_rate_limit(request, "signup", data.email)
     try:
         if not data.email or not data.password:
             raise HTTPException(status_code=422,detail="Email and password are required.")
@@ -45,13 +44,11 @@ async def signup(data: SignUp, background_task:BackgroundTasks, db = Depends(get
             raise HTTPException(status_code=400,detail="User already exists.")
         
         otp = generate_otp()
-        hash_pass = hash_password(data.password)
-        url_token = generate_otp_context_token(data.email)
+        hash_pass = await hash_password(data.password)
+        url_token = await generate_otp_context_token(data.email, otp, hash_pass)
         username, domain = data.email.split("@")
         mail= "".join([username[:5], "***@", domain])
-        background_task.add_task(save_data_redis, data.email, otp, 'otp')
-        background_task.add_task(save_data_redis, data.email, hash_pass, 'password')
-        background_task.add_task(send_mail_fast, data.email, otp)
+        await send_mail_fast(data.email, otp)
 
         print(otp, data.email)
         return {
@@ -70,7 +67,7 @@ async def signup(data: SignUp, background_task:BackgroundTasks, db = Depends(get
 @router.get("/verify-otp-token")
 async def verify_otp_token(token: str):
     try:
-        email = get_email_url(token)
+        email = await get_email_url(token)
     
         if not email:
             raise HTTPException(status_code=401, detail="Invalid or expired token")
@@ -82,30 +79,25 @@ async def verify_otp_token(token: str):
 
 
 @router.post("/verify-otp")
-async def verify_otp(data:VerifyOTP, response: Response, background_task:BackgroundTasks, db = Depends(get_db)):
+async def verify_otp(data:VerifyOTP, response: Response, db = Depends(get_db)):
     try:
         if not data.token or not data.otp:
             raise HTTPException(status_code=422,detail="Token and OTP are required.")
-        user_email = get_email_url(data.token)
-        is_verify = verify_otp_redis(user_email, data.otp)
-        if not is_verify:
+        pending = await consume_pending_signup(data.token, data.otp)
+        if not pending:
             raise HTTPException(status_code=400, detail="Invalid or expired OTP")
-        password = get_saved_password(user_email)
-        if not password:
-            raise HTTPException(status_code=400,detail="Password expired or missing")
+        user_email = pending["email"]
+        password = pending["password"]
         
         new_user = User(
             email=user_email,
             password=password
         )
         await db.users.insert_one(new_user.model_dump())
-        background_task.add_task(delete_data, user_email, 'otp')
-        background_task.add_task(delete_data, user_email, 'password')
-        background_task.add_task(delete_data, user_email, 'otp_ctx')
 
         jti = generate_jti()              
         session = create_session(user_email, new_user.role)     
-        save_jti(jti, session)
+        await save_jti(jti, session)
 
         access_token = create_access_token(user_email, new_user.role)
         refresh_token = create_refresh_token(user_email, jti)
@@ -138,7 +130,8 @@ async def verify_otp(data:VerifyOTP, response: Response, background_task:Backgro
 
 
 @router.post("/login")
-async def login(data:Login, response: Response, db = Depends(get_db)):
+async def login(data:Login, request: Request, response: Response, db = Depends(get_db)):
+    await enforce_rate_limit(request, "login", data.email)
     try:
         if not data.email or not data.password:
             raise HTTPException(status_code=422,detail="Email and Password are required.")
@@ -150,13 +143,13 @@ async def login(data:Login, response: Response, db = Depends(get_db)):
         if not user["provider"] == "local":
             raise HTTPException(status_code=400,detail="Use Social Authentication.")
         
-        if not verify_password(data.password, user["password"]):
+        if not await verify_password(data.password, user["password"]):
             raise HTTPException(status_code=400,detail="Wrong Password")
         
         role = user.get("role", "student")
         jti = generate_jti()              
         session = create_session(data.email, role)     
-        save_jti(jti, session)
+        await save_jti(jti, session)
 
         access_token = create_access_token(data.email, role)
         refresh_token = create_refresh_token(data.email, jti)
@@ -205,15 +198,10 @@ async def refresh_token(request: Request, response: Response):
     if not email or not old_jti:
         raise HTTPException(status_code=401, detail="invalid_refresh_token_payload")
 
-    if not validate_jti(old_jti, email):
+    rotated = await rotate_jti(old_jti, email)
+    if not rotated:
         raise HTTPException(status_code=401, detail="refresh_token_revoked_or_invalid")
-    
-    try:
-        session = get_jti_session(old_jti)
-        role = session["role"]
-        new_jti = rotate_jti(old_jti)
-    except Exception:
-        raise
+    new_jti, role = rotated
 
     new_access = create_access_token(email, role)
     new_refresh = create_refresh_token(email, new_jti)
@@ -246,7 +234,7 @@ async def logout(request: Request, response: Response):
             payload = verify_refresh_token(refresh_token)
             jti = payload.get("jti")
             if jti:
-                delete_jti(jti)
+                await delete_jti(jti, payload.get("email"))
         except Exception:
             # If token invalid/expired we still clear cookies
             pass
@@ -269,7 +257,7 @@ async def get_current_user(request: Request,credentials: Optional[HTTPAuthorizat
         raise HTTPException(status_code=401, detail="access_token_missing")
 
     try:
-        payload = verify_access_token(token)
+        payload = verify_access_token_cached(token)
     except Exception as e:
         print(f"Token verification failed: {str(e)}")
         traceback.print_exc()
@@ -287,6 +275,44 @@ async def get_current_user(request: Request,credentials: Optional[HTTPAuthorizat
 async def dashboard(user = Depends(get_current_user)):
     return { "status":"success", "message": "Welcome", "email": user['email'], "role":user['role']}
 
+
+@router.get("/sessions")
+async def get_sessions(request: Request, user = Depends(get_current_user)):
+    try:
+        current_jti = None
+        refresh_token = request.cookies.get(REFRESH_COOKIE_NAME)
+        if refresh_token:
+            try:
+                current_jti = verify_refresh_token(refresh_token).get("jti")
+            except Exception:
+                pass
+
+        sessions = await list_sessions(user['email'])
+        for session in sessions:
+            session["current"] = session["jti"] == current_jti
+
+        return {"status": "success", "total_sessions": len(sessions), "sessions": sessions}
+
+    except Exception as e:
+        print(e)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Internal Server Error")
+
+
+@router.post("/logout-all")
+async def logout_all(response: Response, user = Depends(get_current_user)):
+    try:
+        revoked = await revoke_all_sessions(user['email'])
+
+        response.delete_cookie(ACCESS_COOKIE_NAME)
+        response.delete_cookie(REFRESH_COOKIE_NAME)
+        return {"status": "success", "revoked_sessions": revoked, "message": "logged_out_everywhere"}
+
+    except Exception as e:
+        print(e)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Internal Server Error")
+
 '''
 ===========================================
 =========== Google Auth ===================
@@ -295,25 +321,18 @@ async def dashboard(user = Depends(get_current_user)):
 
 @router.get("/google/callback")
 async def google_auth(code : str, db = Depends(get_db)):
+    # OAuth client (httpx, google-auth) is only loaded on first callback
+    from authentication.oauth_client import google_exchange_code, google_verify_id_token
     try:
-        token_res = requests.post(
-        "https://oauth2.googleapis.com/token",
-            data={
-                "client_id": os.getenv("GOOGLE_CLIENT_ID"),
-                "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": "http://127.0.0.1:8000/auth/google/callback",
-            },).json()
+        token_res = await google_exchange_code(code, "http://127.0.0.1:8000/auth/google/callback")
         
         if "error" in token_res:
             raise HTTPException(status_code=400, detail=token_res)
         
         id_token_value = token_res["id_token"]
 
-        idinfo = id_token.verify_oauth2_token(
+        idinfo = await google_verify_id_token(
             id_token_value,
-            google_requests.Request(),
             os.getenv("GOOGLE_CLIENT_ID"),
         )
         if not idinfo:
@@ -343,7 +362,7 @@ async def google_auth(code : str, db = Depends(get_db)):
         access_token = create_access_token(email, user["role"])
         jti = generate_jti()              
         session = create_session(email, user["role"])     
-        save_jti(jti, session)
+        await save_jti(jti, session)
 
         refresh_token = create_refresh_token(email, jti)
 
@@ -387,42 +406,21 @@ async def google_auth(code : str, db = Depends(get_db)):
 
 @router.get("/github/callback")
 async def github_auth(code : str, db = Depends(get_db)):
+    from authentication.oauth_client import github_exchange_code, github_fetch_profile
     try:
 
-        token_res = requests.post(
-        "https://github.com/login/oauth/access_token",
-            headers={"Accept": "application/json"},
-            data={
-                "client_id": os.getenv("GITHUB_CLIENT_ID"),
-                "client_secret": os.getenv("GITHUB_SECRAT"),
-                "code": code,
-                "grant_type": "authorization_code",
-                "redirect_uri": "http://127.0.0.1:8000/auth/github/callback",
-            },).json()
+        token_res = await github_exchange_code(code, "http://127.0.0.1:8000/auth/github/callback")
         
         if "error" in token_res:
             raise HTTPException(status_code=400, detail=token_res)
         
         access_token_github = token_res["access_token"]
 
-        user_res = requests.get(
-            "https://api.github.com/user",
-            headers={
-                "Authorization": f"Bearer {access_token_github}",
-                "Accept": "application/json",
-            },
-        ).json()
+        # /user and /user/emails are independent, fetch them together
+        user_res, email_res = await github_fetch_profile(access_token_github)
         github_id = str(user_res["id"])
         name = user_res.get("name") or user_res.get("login")
 
-        email_res = requests.get(
-            "https://api.github.com/user/emails",
-            headers={
-                "Authorization": f"Bearer {access_token_github}",
-                "Accept": "application/json",
-            },
-        ).json()
-
         email = next(
             (e["email"] for e in email_res if e.get("primary") and e.get("verified")),
             None,
@@ -454,7 +452,7 @@ async def github_auth(code : str, db = Depends(get_db)):
 
         access_token = create_access_token(email, user["role"])
         jti = generate_jti()
-        save_jti(jti, create_session(email, user["role"]))
+        await save_jti(jti, create_session(email, user["role"]))
         refresh_token = create_refresh_token(email, jti)
 
         # 6️⃣ Set cookies + redirect
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import re
+import time
+from dotenv import load_dotenv
+
+from utility.http_client import get_http_client
+
+load_dotenv()
+
+# Overridable so the callbacks can be pointed at a local stub OAuth server
+GOOGLE_TOKEN_URL = os.getenv("GOOGLE_TOKEN_URL", "https://oauth2.googleapis.com/token")
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+GITHUB_TOKEN_URL = os.getenv("GITHUB_TOKEN_URL", "https://github.com/login/oauth/access_token")
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+
+GOOGLE_ISSUERS = ["accounts.google.com", "https://accounts.google.com"]
+GOOGLE_CERTS_DEFAULT_TTL = 3600
+
+_google_certs = {"certs": None, "expires_at": 0.0}
+_google_certs_lock = asyncio.Lock()
+
+
+def _max_age(cache_control: str | None) -> int:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return int(match.group(1)) if match else GOOGLE_CERTS_DEFAULT_TTL
+
+
+async def get_google_certs() -> dict:
+    if _google_certs["certs"] and time.time() < _google_certs["expires_at"]:
+        return _google_certs["certs"]
+
+    async with _google_certs_lock:
+        # Another request may have refreshed them while we waited
+        if _google_certs["certs"] and time.time() < _google_certs["expires_at"]:
+            return _google_certs["certs"]
+
+        res = await get_http_client().get(GOOGLE_CERTS_URL)
+        res.raise_for_status()
+        _google_certs["certs"] = res.json()
+        _google_certs["expires_at"] = time.time() + _max_age(res.headers.get("cache-control"))
+        return _google_certs["certs"]
+
+
+async def google_exchange_code(code: str, redirect_uri: str) -> dict:
+    res = await get_http_client().post(
+        GOOGLE_TOKEN_URL,
+        data={
+            "client_id": os.getenv("GOOGLE_CLIENT_ID"),
+            "client_secret": os.getenv("GOOGLE_CLIENT_SECRET"),
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": redirect_uri,
+        },
+    )
+    return res.json()
+
+
+async def google_verify_id_token(token: str, client_id: str) -> dict:
+    from google.auth import jwt as google_jwt
+
+    certs = await get_google_certs()
+    idinfo = google_jwt.decode(token, certs=certs, audience=client_id, clock_skew_in_seconds=10)
+    if idinfo.get("iss") not in GOOGLE_ISSUERS:
+        raise ValueError(f"Wrong issuer: {idinfo.get('iss')}")
+    return idinfo
+
+
+async def github_exchange_code(code: str, redirect_uri: str) -> dict:
+    res = await get_http_client().post(
+        GITHUB_TOKEN_URL,
+        headers={"Accept": "application/json"},
+        data={
+            "client_id": os.getenv("GITHUB_CLIENT_ID"),
+            "client_secret": os.getenv("GITHUB_SECRAT"),
+            "code": code,
+            "grant_type": "authorization_code",
+            "redirect_uri": redirect_uri,
+        },
+    )
+    return res.json()
+
+
+async def github_fetch_profile(access_token: str) -> tuple[dict, list]:
+    client = get_http_client()
+    headers = {
+        "Authorization": f"Bearer {access_token}",
+        "Accept": "application/json",
+    }
+    user_res, email_res = await asyncio.gather(
+        client.get(f"{GITHUB_API_URL}/user", headers=headers),
+        client.get(f"{GITHUB_API_URL}/user/emails", headers=headers),
+    )
+    return user_res.json(), email_res.json()
@@ -0,0 +1,101 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from fastapi import HTTPException
+from dotenv import load_dotenv
+
+load_dotenv()
+
+PASSWORD_EXECUTOR = os.getenv("PASSWORD_EXECUTOR", "thread")   # thread | process
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", 4))
+PASSWORD_QUEUE_LIMIT = int(os.getenv("PASSWORD_QUEUE_LIMIT", 32))
+
+_pwd_context = None
+
+_executor = None
+_in_flight = 0
+_stats = {
+    "calls": 0,
+    "rejected": 0,
+    "total_ms": 0.0,
+    "max_ms": 0.0,
+    "last_ms": 0.0,
+}
+
+
+def get_pwd_context():
+    # passlib is only imported on the first password operation
+    global _pwd_context
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+        _pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+    return _pwd_context
+
+
+# Module level so they can be pickled into a ProcessPoolExecutor
+def _hash(password: str) -> str:
+    return get_pwd_context().hash(password)
+
+def _verify(plain_password: str, hashed_password: str) -> bool:
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+def get_executor():
+    global _executor
+    if _executor is None:
+        if PASSWORD_EXECUTOR == "process":
+            _executor = ProcessPoolExecutor(max_workers=PASSWORD_WORKERS)
+        else:
+            _executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="bcrypt")
+    return _executor
+
+
+def shutdown_password_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+async def _run(func, *args):
+    global _in_flight
+    # Reject immediately instead of letting a login storm queue up unbounded work
+    if _in_flight >= PASSWORD_WORKERS + PASSWORD_QUEUE_LIMIT:
+        _stats["rejected"] += 1
+        raise HTTPException(status_code=503, detail="Server busy, please retry shortly")
+
+    _in_flight += 1
+    start = time.perf_counter()
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(get_executor(), func, *args)
+    finally:
+        _in_flight -= 1
+        elapsed = (time.perf_counter() - start) * 1000
+        _stats["calls"] += 1
+        _stats["total_ms"] += elapsed
+        _stats["last_ms"] = elapsed
+        _stats["max_ms"] = max(_stats["max_ms"], elapsed)
+
+
+async def hash_password_async(password: str) -> str:
+    return await _run(_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await _run(_verify, plain_password, hashed_password)
+
+
+def password_pool_stats() -> dict:
+    calls = _stats["calls"]
+    return {
+        "executor": PASSWORD_EXECUTOR,
+        "workers": PASSWORD_WORKERS,
+        "queue_limit": PASSWORD_QUEUE_LIMIT,
+        "in_flight": _in_flight,
+        "calls": calls,
+        "rejected": _stats["rejected"],
+        "avg_ms": round(_stats["total_ms"] / calls, 2) if calls else 0.0,
+        "max_ms": round(_stats["max_ms"], 2),
+        "last_ms": round(_stats["last_ms"], 2),
+    }
@@ -1,24 +1,152 @@
+import asyncio
 import random
+import time
 import aiosmtplib
 from email.message import EmailMessage
+from fastapi import HTTPException
+from dotenv import load_dotenv
 import os
 
+load_dotenv()
 
-async def send_mail_fast(to: str, otp:str):
+MAIL_WORKERS = int(os.getenv("MAIL_WORKERS", 2))            # = persistent SMTP connections
+MAIL_QUEUE_SIZE = int(os.getenv("MAIL_QUEUE_SIZE", 1000))
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", 20))
+MAIL_MAX_RETRIES = int(os.getenv("MAIL_MAX_RETRIES", 3))
+MAIL_RETRY_BASE = float(os.getenv("MAIL_RETRY_BASE", 0.5))  # seconds, doubled per retry
+MAIL_START_TLS = os.getenv("MAIL_START_TLS", "true").lower() == "true"
+MAIL_DRAIN_TIMEOUT = float(os.getenv("MAIL_DRAIN_TIMEOUT", 10))  # seconds allowed at shutdown
+
+_mail_queue = None
+_workers = []
+_stats = {
+    "sent": 0,
+    "failed": 0,
+    "retries": 0,
+    "batches": 0,
+    "total_ms": 0.0,
+    "max_ms": 0.0,
+}
+
+
+def build_otp_message(to: str, otp: str) -> EmailMessage:
     msg = EmailMessage()
     msg["From"] = os.getenv("EMAIL_FROM")
     msg["To"] = to
     msg["Subject"] = "Login Otp"
     msg.set_content(f"Your Login mail is {otp}")
+    return msg
+
 
-    await aiosmtplib.send(
-        message=msg,
+async def _connect() -> aiosmtplib.SMTP:
+    smtp = aiosmtplib.SMTP(
         hostname=os.getenv("EMAIL_HOST"),
         port=int(os.getenv("EMAIL_PORT")),
-        username=os.getenv("EMAIL_FROM"),
-        password=os.getenv("EMAIL_PASS"),
-        start_tls=True
+        start_tls=MAIL_START_TLS,
     )
+    await smtp.connect()
+    if os.getenv("EMAIL_PASS"):
+        await smtp.login(os.getenv("EMAIL_FROM"), os.getenv("EMAIL_PASS"))
+    return smtp
+
+
+async def _close(smtp):
+    if smtp is None:
+        return
+    try:
+        await smtp.quit()
+    except Exception:
+        smtp.close()
+
+
+async def _send_with_retry(smtp, msg: EmailMessage):
+    # Returns the (possibly reconnected) connection so the worker keeps reusing it
+    for attempt in range(MAIL_MAX_RETRIES + 1):
+        try:
+            if smtp is None or not smtp.is_connected:
+                smtp = await _connect()
+            start = time.perf_counter()
+            await smtp.send_message(msg)
+            elapsed = (time.perf_counter() - start) * 1000
+            _stats["sent"] += 1
+            _stats["total_ms"] += elapsed
+            _stats["max_ms"] = max(_stats["max_ms"], elapsed)
+            return smtp
+        except Exception as e:
+            print("Mail Send Error:", e)
+            await _close(smtp)
+            smtp = None
+            if attempt == MAIL_MAX_RETRIES:
+                _stats["failed"] += 1
+                return smtp
+            _stats["retries"] += 1
+            await asyncio.sleep(MAIL_RETRY_BASE * (2 ** attempt))
+    return smtp
+
+
+async def _mail_worker():
+    smtp = None
+    try:
+        while True:
+            batch = [await _mail_queue.get()]
+            # Drain whatever is already waiting so one connection sends the batch
+            while len(batch) < MAIL_BATCH_SIZE and not _mail_queue.empty():
+                batch.append(_mail_queue.get_nowait())
+
+            _stats["batches"] += 1
+            for msg in batch:
+                smtp = await _send_with_retry(smtp, msg)
+                _mail_queue.task_done()
+    except asyncio.CancelledError:
+        await _close(smtp)
+        raise
+
+
+def start_mail_dispatcher():
+    global _mail_queue
+    if _workers:
+        return
+    _mail_queue = asyncio.Queue(maxsize=MAIL_QUEUE_SIZE)
+    for _ in range(MAIL_WORKERS):
+        _workers.append(asyncio.create_task(_mail_worker()))
+
+
+async def stop_mail_dispatcher():
+    # Let the workers finish what is queued (including mails in retry backoff)
+    # before cancelling them, so a deploy does not drop pending OTPs
+    if _workers and _mail_queue is not None:
+        try:
+            await asyncio.wait_for(_mail_queue.join(), MAIL_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            print(f"Mail queue not drained after {MAIL_DRAIN_TIMEOUT}s, dropping {_mail_queue.qsize()} queued mails")
+    for task in _workers:
+        task.cancel()
+    await asyncio.gather(*_workers, return_exceptions=True)
+    _workers.clear()
+
+
+async def send_mail_fast(to: str, otp:str):
+    if not _workers:
+        start_mail_dispatcher()
+    try:
+        _mail_queue.put_nowait(build_otp_message(to, otp))
+    except asyncio.QueueFull:
+        raise HTTPException(status_code=503, detail="Mail service busy, please retry shortly")
+
+
+def mail_queue_stats() -> dict:
+    sent = _stats["sent"]
+    return {
+        "workers": len(_workers),
+        "queue_depth": _mail_queue.qsize() if _mail_queue else 0,
+        "queue_size": MAIL_QUEUE_SIZE,
+        "sent": sent,
+        "failed": _stats["failed"],
+        "retries": _stats["retries"],
+        "batches": _stats["batches"],
+        "avg_send_ms": round(_stats["total_ms"] / sent, 2) if sent else 0.0,
+        "max_send_ms": round(_stats["max_ms"], 2),
+    }
 
 
 
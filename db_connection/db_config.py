@@ -6,13 +6,14 @@ load_dotenv()
 
 MONGO_URI = os.getenv("DB_URI")
 MONGO_DB = os.getenv("DB_Name")
+MONGO_TIMEOUT_MS = int(os.getenv("MONGO_TIMEOUT_MS", 5000))
 
 db = None
 client = None
 
 async def connect_to_mongo(app):
     try:
-        client = AsyncIOMotorClient(MONGO_URI)
+        client = AsyncIOMotorClient(MONGO_URI, serverSelectionTimeoutMS=MONGO_TIMEOUT_MS)
         # Test connection by running a ping command
         await client.admin.command("ping")
         
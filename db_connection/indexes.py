@@ -0,0 +1,162 @@
+"""
+Declared indexes for every collection, created idempotently at startup.
+
+    python -m db_connection.indexes ensure    # seed library stats, run migrations + create indexes
+    python -m db_connection.indexes report    # missing / undeclared / unused indexes
+"""
+import asyncio
+import sys
+import pymongo
+from pymongo import IndexModel, UpdateOne
+
+ASC = pymongo.ASCENDING
+
+INDEXES = {
+    "users": [
+        # login, signup, OAuth callbacks, profile
+        IndexModel([("email", ASC)], name="email_1", unique=True),
+        # /admin/list-student keyset walk over students by (email, _id);
+        # its role prefix also serves the role counts, so no separate role_1
+        IndexModel([("role", ASC), ("email", ASC), ("_id", ASC)], name="role_1_email_1__id_1"),
+    ],
+    "issued_books": [
+        # admin queues by status; dashboard overdue count (status $in + return_date $lt)
+        IndexModel([("status", ASC), ("return_date", ASC)], name="status_1_return_date_1"),
+        # admin request queues: status equality, then (date, _id) keyset walk
+        IndexModel([("status", ASC), ("request_date", ASC), ("_id", ASC)], name="status_1_request_date_1__id_1"),
+        IndexModel([("status", ASC), ("issue_date", ASC), ("_id", ASC)], name="status_1_issue_date_1__id_1"),
+        IndexModel([("status", ASC), ("renew_request_date", ASC), ("_id", ASC)], name="status_1_renew_request_date_1__id_1"),
+        IndexModel([("status", ASC), ("return_request_date", ASC), ("_id", ASC)], name="status_1_return_request_date_1__id_1"),
+        # student lists / counts by {email, status}
+        IndexModel([("email", ASC), ("status", ASC)], name="email_1_status_1"),
+        # duplicate check in book_request
+        IndexModel([("email", ASC), ("book_id", ASC), ("status", ASC)], name="email_1_book_id_1_status_1"),
+    ],
+    "books": [
+        # duplicate check in add_book
+        IndexModel([("title", ASC), ("author", ASC), ("edition", ASC)], name="title_1_author_1_edition_1"),
+        # /books/all keyset sort orders, (field, _id) walked either direction
+        IndexModel([("title", ASC), ("_id", ASC)], name="title_1__id_1"),
+        IndexModel([("author", ASC), ("_id", ASC)], name="author_1__id_1"),
+        IndexModel([("added_at", ASC), ("_id", ASC)], name="added_at_1__id_1"),
+        IndexModel([("available", ASC), ("_id", ASC)], name="available_1__id_1"),
+        # /books/all search modes
+        IndexModel([("title_lower", ASC)], name="title_lower_1"),
+        IndexModel([("author_lower", ASC)], name="author_lower_1"),
+        IndexModel(
+            [("title", pymongo.TEXT), ("author", pymongo.TEXT)],
+            weights={"title": 10, "author": 5},
+            name="books_text",
+        ),
+    ],
+}
+
+# Indexes superseded by a declared one; dropped where an older deployment built them
+RETIRED_INDEXES = {
+    "users": ["role_1"],    # prefix of role_1_email_1__id_1
+}
+
+
+async def backfill_search_fields(db, batch_size: int = 1000):
+    # Books created before title_lower/author_lower existed. Normalized in
+    # Python through search_fields, like new books: Mongo's $toLower is
+    # ASCII-only and would leave non-ASCII titles unmatched by prefix search.
+    from utility.book_search import search_fields
+
+    updated = 0
+    batch = []
+    cursor = db.books.find({"title_lower": {"$exists": False}}, {"title": 1, "author": 1})
+    async for book in cursor:
+        batch.append(UpdateOne({"_id": book["_id"]}, {"$set": search_fields(book.get("title") or "", book.get("author") or "")}))
+        if len(batch) >= batch_size:
+            updated += (await db.books.bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        updated += (await db.books.bulk_write(batch, ordered=False)).modified_count
+    if updated:
+        print(f"Backfilled search fields on {updated} books")
+
+
+MIGRATIONS = [backfill_search_fields]
+
+
+async def ensure_indexes(db):
+    for migration in MIGRATIONS:
+        try:
+            await migration(db)
+        except Exception as e:
+            print(f"Migration {migration.__name__} Error:", e)
+
+    for collection, names in RETIRED_INDEXES.items():
+        existing = {index["name"] async for index in db[collection].list_indexes()}
+        for name in names:
+            if name in existing:
+                try:
+                    await db[collection].drop_index(name)
+                    print(f"Dropped retired index {collection}.{name}")
+                except Exception as e:
+                    print(f"Index Drop Error ({collection}.{name}):", e)
+
+    # One command per index: a conflict on one (e.g. duplicate emails under a
+    # unique index) must not abort the others. Existing identical specs are no-ops.
+    for collection, models in INDEXES.items():
+        for model in models:
+            try:
+                await db[collection].create_indexes([model])
+            except Exception as e:
+                print(f"Index Creation Error ({collection}.{model.document['name']}):", e)
+
+
+async def index_report(db) -> dict:
+    report = {}
+    for collection, models in INDEXES.items():
+        declared = {model.document["name"] for model in models}
+        existing = set()
+        async for index in db[collection].list_indexes():
+            existing.add(index["name"])
+
+        unused = []
+        try:
+            async for stat in db[collection].aggregate([{"$indexStats": {}}]):
+                if stat["name"] != "_id_" and stat["accesses"]["ops"] == 0:
+                    unused.append(stat["name"])
+        except Exception as e:
+            # $indexStats needs clusterMonitor on some hosted clusters
+            print(f"Index Stats Error ({collection}):", e)
+
+        report[collection] = {
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared - {"_id_"}),
+            "unused": sorted(unused),
+        }
+    return report
+
+
+async def _cli(command: str):
+    from db_connection.db_config import MONGO_URI, MONGO_DB
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(MONGO_URI)
+    db = client[MONGO_DB]
+    try:
+        if command == "ensure":
+            from utility.library_stats import ensure_library_stats
+
+            # Seeded first, like at startup, so counters never start from a partial doc
+            await ensure_library_stats(db)
+            await ensure_indexes(db)
+        report = await index_report(db)
+        for collection, entry in report.items():
+            print(f"{collection}:")
+            for key in ("missing", "undeclared", "unused"):
+                print(f"  {key:<10} {', '.join(entry[key]) or '-'}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "report"
+    if command not in ("ensure", "report"):
+        print(__doc__)
+        sys.exit(2)
+    asyncio.run(_cli(command))
@@ -1,5 +1,5 @@
 
-import redis
+import redis.asyncio as redis
 import os
 from dotenv import load_dotenv
 
@@ -9,18 +9,30 @@ REDIS_HOST = os.getenv("REDIS_HOST")
 REDIS_PORT = int(os.getenv("REDIS_PORT"))
 REDIS_PASSWORD = os.getenv("REDIS_PASSWORD")
 REDIS_DB = int(os.getenv("REDIS_DB", 0))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 5))
 
-redis_client = redis.Redis(
+# Bounded pool: when every connection is busy, callers wait up to
+# REDIS_POOL_TIMEOUT seconds for one instead of opening new sockets.
+redis_pool = redis.BlockingConnectionPool(
     host=REDIS_HOST,
     port=REDIS_PORT,
     password=REDIS_PASSWORD,
     db=REDIS_DB,
+    max_connections=REDIS_MAX_CONNECTIONS,
+    timeout=REDIS_POOL_TIMEOUT,
     decode_responses=True
 )
 
-def test_redis():
+redis_client = redis.Redis(connection_pool=redis_pool)
+
+async def test_redis():
     try:
-        redis_client.set("test", "Success",120)
-        print(f"Redis Cloud: {redis_client.get('test')}")
+        await redis_client.set("test", "Success",120)
+        print(f"Redis Cloud: {await redis_client.get('test')}")
     except Exception as e:
-        print("Redis Cloud Error:", e)
\ No newline at end of file
+        print("Redis Cloud Error:", e)
+
+async def close_redis():
+    await redis_pool.disconnect()
+    print("🔌 Redis Connection Closed")
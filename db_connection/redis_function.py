@@ -5,36 +5,50 @@ import os
 load_dotenv()
 REDIS_EXPIRE = int(os.getenv("REDIS_EXPIRE", 300))
 
-def save_data_redis(email: str, otp: str, data_type:str) -> bool: #data_type = [password, otp, refresh]
+# Pending signup lives in one hash (email, otp, password) under one TTL,
+# so the OTP and the password hash can never expire at different times.
+CONSUME_SIGNUP_SCRIPT = """
+local v = redis.call('HMGET', KEYS[1], 'otp', 'email', 'password')
+if not v[1] then
+    return {0}
+end
+if v[1] ~= ARGV[1] then
+    return {-1}
+end
+redis.call('DEL', KEYS[1])
+return {1, v[2], v[3]}
+"""
+_consume_signup = redis_client.register_script(CONSUME_SIGNUP_SCRIPT)
+
+
+async def save_pending_signup(token: str, email: str, otp: str, password: str) -> bool:
     try:
-        redis_client.setex(f"{data_type}:{email}", REDIS_EXPIRE, otp)
+        key = f"signup:{token}"
+        async with redis_client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={"email": email, "otp": otp, "password": password})
+            pipe.expire(key, REDIS_EXPIRE)
+            await pipe.execute()
         return True
     except Exception as e:
         print("Redis Save Error:", e)
         return False
 
 
-def get_saved_password(email: str) -> str | None:
+async def get_pending_email(token: str) -> str | None:
     try:
-        return redis_client.get(f"password:{email}")
+        return await redis_client.hget(f"signup:{token}", "email")
     except Exception as e:
         print("Redis Get Error:", e)
         return None
 
 
-def verify_otp_redis(email: str, otp: str) -> bool:
+async def consume_pending_signup(token: str, otp: str) -> dict | None:
+    # Checks the OTP and deletes the pending signup in one atomic round trip
     try:
-        saved = redis_client.get(f"otp:{email}")
-        if saved is None:
-            return False
-        return saved == otp
+        res = await _consume_signup(keys=[f"signup:{token}"], args=[otp])
+        if int(res[0]) != 1:
+            return None
+        return {"email": res[1], "password": res[2]}
     except Exception as e:
         print("Redis Verification Error:", e)
-        return False
-
-def delete_data(email:str, data_type:str):
-    try:
-        key = f"{data_type}:{email}"
-        redis_client.delete(key)
-    except Exception as e:
-        print("Redis Delete Error:", e)
+        return None
@@ -1,8 +1,17 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from db_connection.db_config import connect_to_mongo
-from db_connection.redis_config import test_redis
+from db_connection.indexes import ensure_indexes
+from utility.library_stats import ensure_library_stats
+from db_connection.redis_config import test_redis, close_redis
+from authentication.password_pool import shutdown_password_pool
+from utility.http_client import close_http_client
+from utility.responses import FastJSONResponse
+from authentication.send_mail import start_mail_dispatcher, stop_mail_dispatcher
 
 from authentication.auth_function import router as auth_router
 from routers.admin_routers import router as admin_router
@@ -10,8 +19,57 @@ from routers.book_routers import router as books_router
 from routers.student_routers import router as student_router
 
 
+STARTUP_TIMEOUT = float(os.getenv("STARTUP_TIMEOUT", 10))
+# Off in deployments that run `python -m db_connection.indexes ensure` themselves
+AUTO_ENSURE_INDEXES = os.getenv("AUTO_ENSURE_INDEXES", "true").lower() == "true"
 
-app = FastAPI()
+
+async def _maintain_db(db):
+    # Migrations and index builds can take minutes on a large catalog, so they
+    # run beside the server instead of blocking startup. Stats are seeded
+    # first: a write path's $inc in the meantime must not precede the rebuild.
+    try:
+        await ensure_library_stats(db)
+        if AUTO_ENSURE_INDEXES:
+            await ensure_indexes(db)
+    except Exception as e:
+        print("DB Maintenance Error:", e)
+
+
+async def _probe(name, coro):
+    try:
+        await asyncio.wait_for(coro, STARTUP_TIMEOUT)
+    except asyncio.TimeoutError:
+        print(f"{name} startup probe timed out after {STARTUP_TIMEOUT}s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.mongo_client = None
+    app.state.db = None
+    # Mongo and Redis are independent, probe them concurrently
+    await asyncio.gather(
+        _probe("MongoDB", connect_to_mongo(app)),
+        _probe("Redis", test_redis()),
+    )
+    maintenance = None
+    if app.state.db is not None:
+        maintenance = asyncio.create_task(_maintain_db(app.state.db))
+    start_mail_dispatcher()
+    yield
+    if maintenance and not maintenance.done():
+        maintenance.cancel()
+    await stop_mail_dispatcher()
+    client = getattr(app.state, "mongo_client", None)
+    if client:
+        client.close()
+        print("🔌 MongoDB Connection Closed")
+    await close_redis()
+    shutdown_password_pool()
+    await close_http_client()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -25,18 +83,6 @@ app.add_middleware(
 )
 
 
-@app.on_event("startup")
-async def startup_event():
-    await connect_to_mongo(app)
-    test_redis()
-
-@app.on_event("shutdown")
-async def shutdown_event():
-    client = app.state.mongo_client
-    if client:
-        client.close()
-        print("🔌 MongoDB Connection Closed")
-
 @app.get("/get")
 def home():
     return {"message": "FastAPI is working!"}
@@ -30,6 +30,9 @@ class approve_Reject_Book_Request(BaseModel):
     request_id: str
     action: str
 
+class Bulk_Request_Actions(BaseModel):
+    items: List[approve_Reject_Book_Request]
+
 
 class BookCategori(str, Enum):
     math = "mathematics"
@@ -39,6 +42,7 @@ class BookCategori(str, Enum):
     others = "others"
 
 class Change_Book_Class(BaseModel):
+    id: str
     title: str
     author: str
     description: str
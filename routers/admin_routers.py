@@ -1,12 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+import asyncio
+import os
+import time
 import traceback
 from bson import ObjectId
 from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Literal
 
 
 from authentication.auth_function import get_current_user
+from authentication.password_pool import password_pool_stats
+from authentication.send_mail import mail_queue_stats
+from utility.jwt_helper import token_cache_stats
 from db_connection.db_provider import get_db
-from models.books_model import Books, Delete_book, approve_Reject_Book_Request, Change_Book_Class
+from db_connection.indexes import index_report
+from models.books_model import Books, Delete_book, approve_Reject_Book_Request, Change_Book_Class, Bulk_Request_Actions
+from utility.book_search import search_fields, build_search_filter, BOOK_LIST_FIELDS
+from utility.pagination import encode_cursor, decode_cursor, keyset_filter, sort_spec
+from utility.request_actions import apply_request_actions, BULK_MAX_ITEMS
+from utility.request_queue import fetch_queue, parse_queue_fields
+from utility.export_helper import stream_export, EXPORT_BATCH_SIZE
+from utility.responses import FastJSONResponse
+from utility.single_flight import single_flight
+from utility.library_stats import ISSUED_STATUSES, read_stats, inc_stats, inc_month, rebuild_stats
+from utility.book_cache import book_cache_stats
+from utility.catalog_cache import catalog_changed, catalog_cache_stats
 
 router = APIRouter()
 
@@ -14,32 +33,96 @@ async def admin_check(user =  Depends(get_current_user)) -> bool:
     return user['role'] == 'admin' if user['role'] else False
 
 
+# Every status an issued_books record can be in
+ISSUE_STATUSES = ["requested", "rejected", "approved", "renew_requested", "renewed",
+                  "renew_rejected", "return_requested", "returned"]
+LIST_STUDENT_MAX_ISSUES = int(os.getenv("LIST_STUDENT_MAX_ISSUES", 50))
+
+
+def list_student_pipeline(keyset: dict, limit: int, status: list | None, expand: bool) -> list:
+    # Walks users in (email, _id) order and stops after limit + 1 matching
+    # students, so memory is bounded by the page, not by issued_books
+    issue_match = {"status": {"$in": status}} if status else {}
+    pipeline = [
+        {"$match": {"role": "student", **keyset}},
+        {"$sort": dict(sort_spec("email", "asc"))},
+        {"$lookup": {
+            "from": "issued_books",
+            "localField": "email",
+            "foreignField": "email",
+            "pipeline": [
+                {"$match": issue_match},
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}},
+            ],
+            "as": "by_status",
+        }},
+        # Only students with at least one (matching) issue, as before
+        {"$match": {"by_status.0": {"$exists": True}}},
+        {"$limit": limit + 1},
+    ]
+    if expand:
+        pipeline.append({"$lookup": {
+            "from": "issued_books",
+            "localField": "email",
+            "foreignField": "email",
+            "pipeline": [
+                {"$match": issue_match},
+                {"$sort": {"request_date": -1}},
+                {"$limit": LIST_STUDENT_MAX_ISSUES},
+            ],
+            "as": "issued_books",
+        }})
+    pipeline.append({"$project": {
+        "_id": 1,
+        "name": 1,
+        "email": 1,
+        "total_issues": {"$sum": "$by_status.count"},
+        "by_status": {"$arrayToObject": {
+            "$map": {"input": "$by_status", "as": "s", "in": {"k": "$$s._id", "v": "$$s.count"}}
+        }},
+        **({"issued_books": 1} if expand else {}),
+    }})
+    return pipeline
+
+
 @router.get("/list-student")
-async def list_student(is_admin =Depends(admin_check), db = Depends(get_db)):
+async def list_student(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(20, ge=1, le=100),
+    status: Optional[List[str]] = Query(None),
+    expand: bool = Query(False, description="Include the student's issue records"),
+    is_admin =Depends(admin_check),
+    db = Depends(get_db)
+):
     if not is_admin:
         raise HTTPException(status_code=401, detail="Access deny")
-    result = []
     try:
-        issued = await db.issued_books.find({}).to_list(None)
-
-        if not issued:
-            return {"total_students": len(result), "students": [], "message":"Successfull"}
-    
-        emails = list({record["email"] for record in issued})
-    
-        students = await db.users.find({"email": {"$in": emails}, "role":"student"}).to_list(None)
-    
+        if status and any(s not in ISSUE_STATUSES for s in status):
+            raise HTTPException(status_code=400, detail="Invalid status")
+
+        keyset = {}
+        if cursor:
+            parsed = decode_cursor(cursor, "email", "asc")
+            if parsed is None:
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            keyset = keyset_filter("email", "asc", parsed["v"], parsed["id"])
+
+        pipeline = list_student_pipeline(keyset, limit, status, expand)
+        students = await db.users.aggregate(pipeline).to_list(limit + 1)
+
+        has_more = len(students) > limit
+        students = students[:limit]
+        next_cursor = encode_cursor("email", "asc", students[-1]) if has_more else None
         for student in students:
-            student_issues = [
-                item for item in issued if item["email"] == student["email"]
-            ]
-            result.append({
-                "name": student.get("name"),
-                "email": student.get("email"),
-                "issued_books": student_issues
-            })
-
-        return {"total_students": len(result),"students": result, "message":"Successfull"}
+            del student["_id"]
+
+        return FastJSONResponse({
+            "total_students": len(students),
+            "students": students,
+            "nextCursor": next_cursor,
+            "hasMore": has_more,
+            "message":"Successfull"
+        })
 
     except HTTPException:
         raise
@@ -65,6 +148,7 @@ async def add_book(book_data: Books,is_admin = Depends(admin_check), db = Depend
                 {"_id": existing_book["_id"]},
                 {"$set": {"quantity": new_quantity, "available": new_available}}
             )
+            await catalog_changed(existing_book["_id"])
 
             return {
                 "status": "success",
@@ -80,8 +164,12 @@ async def add_book(book_data: Books,is_admin = Depends(admin_check), db = Depend
         new_book_dict["added_at"] = datetime.utcnow()
 
         new_book_dict["category"] = [cat.value for cat in new_book_dict["category"]]
+        new_book_dict.update(search_fields(book_data.title, book_data.author))
 
         result = await db.books.insert_one(new_book_dict)
+        await catalog_changed()
+        await inc_stats(db, total_books=1)
+        await inc_month(db, new_book_dict["added_at"], 1)
 
         new_book_dict["_id"] = str(result.inserted_id)
 
@@ -117,6 +205,9 @@ async def delete_book(book_data: Delete_book, is_admin = Depends(admin_check), d
 
         if new_quantity == 0:
             await db.books.delete_one({"_id": existing_book["_id"]})
+            await catalog_changed(existing_book["_id"])
+            await inc_stats(db, total_books=-1)
+            await inc_month(db, existing_book.get("added_at"), -1)
             return {
                 "status": "success",
                 "message": "Book completely removed from library"
@@ -126,6 +217,7 @@ async def delete_book(book_data: Delete_book, is_admin = Depends(admin_check), d
                 {"_id": existing_book["_id"]},
                 {"$set": {"quantity": new_quantity, "available": new_available}}
             )
+        await catalog_changed(existing_book["_id"])
         
         return {
             "status": "success",
@@ -145,138 +237,163 @@ async def delete_book(book_data: Delete_book, is_admin = Depends(admin_check), d
 
 
 
-async def fetch_books_data(db):
+@router.get("/export-books")
+async def export_books(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    gzip: bool = False,
+    fields: Optional[str] = Query(None, description="Comma separated fields, all fields if omitted"),
+    book_type: Optional[List[str]] = Query(None),
+    book_name: Optional[str] = None,
+    book_author: Optional[str] = None,
+    edition: Optional[int] = None,
+    search_mode: Literal["regex", "prefix", "text"] = "regex",
+    is_admin = Depends(admin_check),
+    db = Depends(get_db)
+):
+    if not is_admin:
+        raise HTTPException(status_code=401, detail="Access deny")
     try:
-        total_books = await db.books.count_documents({})
-
-        now = datetime.utcnow()
-        # 🔹 Start of current month (1 Jan 00:00:00)
-        start_current_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        
-        # 🔹 Start of last month (1 Dec 00:00:00)
-        start_last_month = (start_current_month - timedelta(days=1)).replace(
-            day=1, hour=0, minute=0, second=0, microsecond=0
+        columns = None
+        projection = None
+        if fields:
+            columns = [f.strip() for f in fields.split(",") if f.strip()]
+            unknown = [f for f in columns if f not in BOOK_LIST_FIELDS and f != "_id"]
+            if unknown:
+                raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+            projection = {f: 1 for f in columns}
+            if "_id" not in columns:
+                projection["_id"] = 0
+
+        query = build_search_filter(search_mode, book_name, book_author)
+        if book_type:
+            query["category"] = {"$in": book_type}
+        if edition:
+            query["edition"] = edition
+
+        # Streamed straight off the cursor, never materialized as a list
+        cursor = db.books.find(query, projection).sort("_id", 1).batch_size(EXPORT_BATCH_SIZE)
+
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+        filename = f"books.{'csv' if format == 'csv' else 'ndjson'}{'.gz' if gzip else ''}"
+        headers = {"Content-Disposition": f'attachment; filename="{filename}"'}
+        if gzip:
+            media_type = "application/gzip"
+
+        return StreamingResponse(
+            stream_export(cursor, format, columns, gzip),
+            media_type=media_type,
+            headers=headers,
         )
-        
-        # ✅ Current Month: 1/1 → today
-        current_month_books = await db["books"].count_documents({
-            "added_at": {
-                "$gte": start_current_month,
-                "$lt": now
-            }
-        })
-        
-        # ✅ Last Month: 1/12 → 31/12
-        last_month_books = await db.books.count_documents({
-            "added_at": {
-                "$gte": start_last_month,
-                "$lt": start_current_month
-            }
-        })
-        print(current_month_books, last_month_books)
-
-        percentage_change = 0
-        if last_month_books == 0:
-            percentage_change = current_month_books
-        else:
-            percentage_change = round(
-                ((current_month_books - last_month_books) / last_month_books) * 100,
-                2
-            )
-        
-        total_issued_books = await db.issued_books.count_documents({"status":{"$in": ["renew_rejected", "renew_requested", "return_requested", "approved", "renewed"]}})
-        overdue_issued_books = await db.issued_books.count_documents({
-            "status":{"$in": ["renew_rejected", "renew_requested", "return_requested", "approved", "renewed"]},
-            "return_date": {"$lt": now}
-        })
 
-        return {
-            "total_books": total_books,
-            "books_percentage_change": percentage_change,
-            "total_issued_books": total_issued_books,
-            "overdue_issued_books": overdue_issued_books
-        }
+    except HTTPException:
+        raise
 
     except Exception as e:
         print(e)
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Internal Server Error")
 
-async def fetch_students_data(db):
-    try:
-        total_students = await db.users.count_documents({"role":"student"})
-        return total_students
 
+POPULAR_STATUSES = ["approved", "renewed", "requested"]
+DASHBOARD_TTL = float(os.getenv("DASHBOARD_TTL", 30))
+
+_dashboard = {"expires_at": 0.0, "data": None}
+
+
+def percentage_change(current: int, last: int):
+    if last == 0:
+        return current
+    return round(((current - last) / last) * 100, 2)
+
+
+async def _popular_books(db, limit: int = 5) -> list:
+    pipeline = [
+        {"$match": {"status": {"$in": POPULAR_STATUSES}}},
+        {"$group": {"_id": "$book_id", "issued_count": {"$sum": 1}}},
+        {"$sort": {"issued_count": -1}},
+        {"$limit": limit},
+        {"$lookup": {
+            "from": "books",
+            "localField": "_id",
+            "foreignField": "_id",
+            "as": "book"
+        }},
+        {"$unwind": "$book"},
+        {"$project": {
+            "_id": 0,
+            "name": "$book.title",
+            "author": "$book.author",
+            "edition": "$book.edition",
+            "added_at": "$book.added_at"
+        }},
+    ]
+    return await db.issued_books.aggregate(pipeline).to_list(length=limit)
+
+
+async def _compute_dashboard(db) -> dict:
+    now = datetime.utcnow()
+    # 🔹 Start of current month / last month, for the month buckets
+    start_current_month = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    start_last_month = (start_current_month - timedelta(days=1)).replace(day=1)
+
+    # Counters come from library_stats (O(1)). Overdue depends on the clock,
+    # so it stays a count bounded by the {status, return_date} index.
+    stats, overdue, popular_books, total_students = await asyncio.gather(
+        read_stats(db, [start_current_month, start_last_month]),
+        db.issued_books.count_documents({
+            "status": {"$in": ISSUED_STATUSES},
+            "return_date": {"$lt": now}
+        }),
+        _popular_books(db),
+        db.users.count_documents({"role": "student"}),
+    )
+    current_month_books, last_month_books = stats["books_added"]
+    return {
+        "total_books": stats["total_books"],
+        "books_percentage_change": percentage_change(current_month_books, last_month_books),
+        "total_students": total_students,
+        "total_issued_books": stats["issued_books"],
+        "pending_requests": stats["pending_requests"],
+        "overdue_issued_books": overdue,
+        "popular_books": popular_books,
+    }
+
+
+async def fetch_dashboard_snapshot(db) -> dict:
+    # Short-lived snapshot; concurrent refreshes share a single recompute
+    if _dashboard["data"] is not None and time.monotonic() < _dashboard["expires_at"]:
+        return _dashboard["data"]
+
+    async def load():
+        data = await _compute_dashboard(db)
+        _dashboard["data"] = data
+        _dashboard["expires_at"] = time.monotonic() + DASHBOARD_TTL
+        return data
+
+    try:
+        return await single_flight("admin_dashboard", load)
     except Exception as e:
         print(e)
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Internal Server Error")
 
-async def fetch_popular_books(db, limit: int = 5):
-    try:
-        pipeline = [
-            {
-            "$match": {
-                "status": {"$in": ["approved", "renewed", "requested"]}
-                }
-            },
-            {
-                "$group": {
-                    "_id": "$book_id",
-                    "issued_count": {"$sum": 1}
-                }
-            },
-            {
-                "$sort": {"issued_count": -1}
-            },
-            {
-                "$limit": limit
-            },
-            {
-                "$lookup": {
-                    "from": "books",
-                    "localField": "_id",
-                    "foreignField": "_id",
-                    "as": "book"
-                }
-            },
-            {
-                "$unwind": "$book"
-            },
-            {
-                "$project": {
-                    "_id": 0,
-                    "name": "$book.title",
-                    "author": "$book.author",
-                    "edition": "$book.edition",
-                    "added_at":"$book.added_at"
-                }
-            }
-        ]
-
-        return await db.issued_books.aggregate(pipeline).to_list(length=limit)
-
-    except Exception as e:
-        print(e)
-        raise HTTPException(status_code=500, detail="Failed to fetch popular books")
 
 @router.get("/admin-dashboard")
 async def admin_dashboard(is_admin = Depends(admin_check), db = Depends(get_db)):
     if not is_admin:
         raise HTTPException(status_code=401, detail="Access deny")
     try:
-        books_details = await fetch_books_data(db)
-        student_details = await fetch_students_data(db)
-        popular_books = await fetch_popular_books(db)
+        snapshot = await fetch_dashboard_snapshot(db)
 
         return {
             "status": "success",
-            "total_books": books_details["total_books"],
-            "total_students": student_details,
-            "popular_books": popular_books,
-            "total_issued_books": books_details["total_issued_books"],
-            "overdue_issued_books": books_details["overdue_issued_books"],
-            "books_percentage_change": books_details["books_percentage_change"],
+            "total_books": snapshot["total_books"],
+            "total_students": snapshot["total_students"],
+            "popular_books": snapshot["popular_books"],
+            "total_issued_books": snapshot["total_issued_books"],
+            "overdue_issued_books": snapshot["overdue_issued_books"],
+            "pending_requests": snapshot["pending_requests"],
+            "books_percentage_change": snapshot["books_percentage_change"],
             "message": "Dashboard data fetched successfully"
         }
 
@@ -289,39 +406,85 @@ async def admin_dashboard(is_admin = Depends(admin_check), db = Depends(get_db))
         raise HTTPException(status_code=500, detail=f"Internal Server Error")
     
 
-@router.get("/list-books-requested")
-async def list_books_requested(is_admin = Depends(admin_check), db = Depends(get_db)):
+@router.get("/runtime-stats")
+async def runtime_stats(is_admin = Depends(admin_check)):
+    if not is_admin:
+        raise HTTPException(status_code=401, detail="Access deny")
+
+    return {
+        "status": "success",
+        "password_pool": password_pool_stats(),
+        "token_cache": token_cache_stats(),
+        "mail_queue": mail_queue_stats(),
+        "book_cache": book_cache_stats(),
+        "catalog_cache": catalog_cache_stats(),
+        "message": "Runtime stats fetched successfully"
+    }
+
+
+@router.get("/index-report")
+async def get_index_report(is_admin = Depends(admin_check), db = Depends(get_db)):
+    if not is_admin:
+        raise HTTPException(status_code=401, detail="Access deny")
+    try:
+        return {
+            "status": "success",
+            "indexes": await index_report(db),
+            "message": "Index report fetched successfully"
+        }
+
+    except Exception as e:
+        print(e)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Internal Server Error")
+
+
+@router.post("/rebuild-stats")
+async def rebuild_library_stats(is_admin = Depends(admin_check), db = Depends(get_db)):
     if not is_admin:
         raise HTTPException(status_code=401, detail="Access deny")
-    
-    result = []
     try:
-        issued_books = await db.issued_books.find({"status":"requested"}).to_list(None)
+        await rebuild_stats(db)
+        _dashboard["expires_at"] = 0.0
+        return {
+            "status": "success",
+            "message": "Library stats rebuilt successfully"
+        }
 
-        if not issued_books:
-            return {"total_requests": len(result), "requests": [], "message":"Successfull"}
-    
-        book_ids = list({record["book_id"] for record in issued_books})
-    
-        books = await db.books.find({"_id": {"$in": book_ids}}).to_list(None)
-    
-        book_dict = {book["_id"]: book for book in books}
+    except Exception as e:
+        print(e)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=f"Internal Server Error")
+
+
+async def queue_page(db, queue: str, cursor, limit, email, fields):
+    try:
+        return await fetch_queue(db, queue, cursor, limit, email, parse_queue_fields(queue, fields))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/list-books-requested")
+async def list_books_requested(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    email: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma separated fields"),
+    is_admin = Depends(admin_check),
+    db = Depends(get_db)
+):
+    if not is_admin:
+        raise HTTPException(status_code=401, detail="Access deny")
     
-        for issued in issued_books:
-            book_info = book_dict.get(issued["book_id"])
-            if book_info:
-                result.append({
-                    "id": str(issued.get("_id")),
-                    "student_email": issued.get("email"),
-                    "book_title": book_info.get("title"),
-                    "book_author": book_info.get("author"),
-                    "issue_date": issued.get("issue_date"),
-                    "return_date": issued.get("return_date"),
-                    "request_date": issued.get("request_date"),
-                    "status": issued.get("status")
-                })
-
-        return {"total_requests": len(result),"requests": result, "message":"Successfull"}
+    try:
+        result, next_cursor, has_more = await queue_page(db, "requested", cursor, limit, email, fields)
+        return FastJSONResponse({
+            "total_requests": len(result),
+            "requests": result,
+            "nextCursor": next_cursor,
+            "hasMore": has_more,
+            "message":"Successfull"
+        })
 
     except HTTPException:
         raise
@@ -368,6 +531,8 @@ async def approve_book_request(data: approve_Reject_Book_Request, is_admin = Dep
             {"_id": book["_id"]},
             {"$inc": {"available": -1}}
         )
+        await catalog_changed(book["_id"])
+        await inc_stats(db, pending_requests=-1, issued_books=1 if data.action in ISSUED_STATUSES else 0)
 
         return {
             "status": "success",
@@ -384,37 +549,26 @@ async def approve_book_request(data: approve_Reject_Book_Request, is_admin = Dep
     
 
 @router.get("/issued-books")
-async def issued_books(is_admin = Depends(admin_check), db = Depends(get_db)):
+async def issued_books(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    email: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma separated fields"),
+    is_admin = Depends(admin_check),
+    db = Depends(get_db)
+):
     if not is_admin:
         raise HTTPException(status_code=401, detail="Access deny")
     
-    result = []
     try:
-        issued_books = await db.issued_books.find({"status":"approved"}).to_list(None)
-
-        if not issued_books:
-            return {"total_issued_books": len(result), "issued_books": [], "message":"Successfull"}
-    
-        book_ids = list({record["book_id"] for record in issued_books})
-    
-        books = await db.books.find({"_id": {"$in": book_ids}}).to_list(None)
-    
-        book_dict = {book["_id"]: book for book in books}
-    
-        for issued in issued_books:
-            book_info = book_dict.get(issued["book_id"])
-            if book_info:
-                result.append({
-                    "id": str(issued.get("_id")),
-                    "student_email": issued.get("email"),
-                    "book_title": book_info.get("title"),
-                    "book_author": book_info.get("author"),
-                    "issue_date": issued.get("issue_date"),
-                    "return_date": issued.get("return_date"),
-                    "status": issued.get("status")
-                })
-
-        return {"total_issued_books": len(result),"issued_books": result, "message":"Successfull"}
+        result, next_cursor, has_more = await queue_page(db, "issued", cursor, limit, email, fields)
+        return FastJSONResponse({
+            "total_issued_books": len(result),
+            "issued_books": result,
+            "nextCursor": next_cursor,
+            "hasMore": has_more,
+            "message":"Successfull"
+        })
 
     except HTTPException:
         raise
@@ -442,10 +596,13 @@ async def book_details_edit(book_data: Change_Book_Class, is_admin = Depends(adm
         if "category" in update_data:
             update_data["category"] = [cat.value for cat in update_data["category"]]
 
+        update_data.update(search_fields(update_data.get("title"), update_data.get("author")))
+
         await db.books.update_one(
             {"_id": existing_book["_id"]},
             {"$set": update_data}
         )
+        await catalog_changed(existing_book["_id"])
 
         return {
             "status": "success",
@@ -461,32 +618,24 @@ async def book_details_edit(book_data: Change_Book_Class, is_admin = Depends(adm
         raise HTTPException(status_code=500, detail=f"Internal Server Error")
 
 @router.get("/list-books-renew-requested")
-async def list_books_renew_requested( is_admin = Depends(admin_check), db = Depends(get_db)):
+async def list_books_renew_requested(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    email: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma separated fields"),
+    is_admin = Depends(admin_check),
+    db = Depends(get_db)
+):
     try:
         if not is_admin:
             raise HTTPException(status_code=403, detail="Access deny")
-        result = []
-        issued_books = await db.issued_books.find({"status":"renew_requested"}).to_list(None)
-        if not issued_books:
-            return {"total_requests": len(result), "requests": [], "message":"Successfull"} 
-        book_ids = list({record["book_id"] for record in issued_books})
-        books = await db.books.find({"_id": {"$in": book_ids}}).to_list(None)
-        book_dict = {book["_id"]: book for book in books}
-        for issued in issued_books:
-            book_info = book_dict.get(issued["book_id"])
-            if book_info:
-                result.append({
-                    "id": str(issued.get("_id")),
-                    "student_email": issued.get("email"),
-                    "book_title": book_info.get("title"),
-                    "book_author": book_info.get("author"),
-                    "issue_date": issued.get("issue_date"),
-                    "return_date": issued.get("return_date"),
-                    "request_date": issued.get("renew_request_date"),
-                    "status": issued.get("status")
-                })
-
-        return {"request_details": result, "message":"Successfull"}
+        result, next_cursor, has_more = await queue_page(db, "renew", cursor, limit, email, fields)
+        return FastJSONResponse({
+            "request_details": result,
+            "nextCursor": next_cursor,
+            "hasMore": has_more,
+            "message":"Successfull"
+        })
     except HTTPException:
         raise
     except Exception as e:
@@ -551,34 +700,26 @@ async def approve_book_renew_request(data:approve_Reject_Book_Request, is_admin
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
 @router.get("/list-books-return-requested")
-async def list_books_return_requested(is_admin = Depends(admin_check), db = Depends(get_db)):
+async def list_books_return_requested(
+    cursor: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    email: Optional[str] = Query(None),
+    fields: Optional[str] = Query(None, description="Comma separated fields"),
+    is_admin = Depends(admin_check),
+    db = Depends(get_db)
+):
     try:
         if not is_admin:
             raise HTTPException(status_code=403, detail="Access Deny")
         
-        result =[]
-        return_reqs = await db.issued_books.find({"status":"return_requested"}).to_list(None)
-
-        if not return_reqs:
-            return {"total_requests": len(result), "requests": [], "message":"Successfull"}
-        book_ids = list({record["book_id"] for record in return_reqs})
-        books = await db.books.find({"_id": {"$in": book_ids}}).to_list(None)
-        book_dict = {book["_id"]: book for book in books}
-        for req in return_reqs:
-            book_info = book_dict.get(req["book_id"])
-            if book_info:
-                result.append({
-                    "id": str(req.get("_id")),
-                    "student_email": req.get("email"),
-                    "book_title": book_info.get("title"),
-                    "book_author": book_info.get("author"),
-                    "issue_date": req.get("issue_date"),
-                    "return_date": req.get("return_date"),
-                    "request_date": req.get("return_request_date"),
-                    "status": req.get("status")
-                })  
-
-        return { "status": "success", "result": result, "message": "Return requests fetch successfully"}
+        result, next_cursor, has_more = await queue_page(db, "return", cursor, limit, email, fields)
+        return FastJSONResponse({
+            "status": "success",
+            "result": result,
+            "nextCursor": next_cursor,
+            "hasMore": has_more,
+            "message": "Return requests fetch successfully"
+        })
 
     except HTTPException:
         raise
@@ -586,7 +727,6 @@ async def list_books_return_requested(is_admin = Depends(admin_check), db = Depe
         print(e)
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Internal Server Error")
-    
 
 @router.post("/approve-book-return-request/{request_id}")
 async def approve_book_return_request(
@@ -611,6 +751,8 @@ async def approve_book_return_request(
             {"_id": issued_request["book_id"]},
             {"$inc": {"available": 1}}
         )
+        await catalog_changed(issued_request["book_id"])
+        await inc_stats(db, issued_books=-1)
         
         await db.issued_books.update_one(
             {"_id": issued_request["_id"]},
@@ -633,6 +775,33 @@ async def approve_book_return_request(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="Internal Server Error")
 
+@router.post("/bulk-request-actions")
+async def bulk_request_actions(data: Bulk_Request_Actions, is_admin = Depends(admin_check), db = Depends(get_db)):
+    if not is_admin:
+        raise HTTPException(status_code=401, detail="Access deny")
+    try:
+        if not data.items:
+            raise HTTPException(status_code=400, detail="Details missing")
+        if len(data.items) > BULK_MAX_ITEMS:
+            raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_ITEMS} items per call")
+
+        results = await apply_request_actions(db, [(item.request_id, item.action) for item in data.items])
+        succeeded = sum(1 for item in results if item["status"] == "success")
+        return {
+            "status": "success",
+            "succeeded": succeeded,
+            "failed": len(results) - succeeded,
+            "results": results,
+            "message": "Bulk actions processed"
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(e)
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="Internal Server Error")
+
 @router.get("/student-details/{stu_id}")
 async def student_details(
     stu_id: str,
@@ -681,7 +850,7 @@ async def student_details(
 
         issued_books = await db.issued_books.aggregate(pipeline).to_list(length=None)
 
-        return {
+        return FastJSONResponse({
             "status": "success",
             "data": {
                 "stu_email": student["email"],
@@ -690,7 +859,7 @@ async def student_details(
                 "books": issued_books
             },
             "message": "Student details fetched successfully"
-        }
+        })
 
     except HTTPException:
         raise
@@ -712,18 +881,18 @@ async def get_all_admins(
         result = []
         for admin in admins:
             result.append({
-                "id": str(admin["_id"]),
+                "id": admin["_id"],
                 "name": admin.get("name"),
                 "email": admin.get("email"),
                 "provider": admin.get("provider"),
                 "created_at": admin.get("created_at")
             })
 
-        return {
+        return FastJSONResponse({
             "status": "success",
             "admins": result,
             "message": "Admins fetched successfully"
-        }
+        })
 
     except HTTPException:
         raise
@@ -1,87 +1,165 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 import traceback
 from bson import ObjectId
-from typing import Optional, List
+from typing import Optional, List, Literal
 
 
 from authentication.auth_function import get_current_user
+from models.books_model import BookCategori
 from db_connection.db_provider import get_db
+from utility.book_search import build_search_filter, parse_fields
+from utility.pagination import encode_cursor, decode_cursor, keyset_filter, sort_spec
+from utility.responses import FastJSONResponse
+from utility.book_cache import get_book_cached
+from utility.catalog_cache import get_catalog_version, get_book_version, page_cache_key, get_page, set_page, etag_matches
 
 router = APIRouter()
 
 async def valid_user_check(user =  Depends(get_current_user)) -> bool:
     return user.get("role") in ["admin", "student"]
 
-def serialize_book(book: dict) -> dict:
-    book["_id"] = str(book["_id"])
-    return book
+# Every reuse must be revalidated with us, which is where auth is checked
+CATALOG_CACHE_CONTROL = "no-cache"
 
 @router.get("/all")
 async def get_all_books( 
+    request: Request,
     cursor: Optional[str] = Query(None),
     limit: int = Query(20, le=50),
     book_type: Optional[List[str]] = Query(None),
     book_name: Optional[str] = None,
     book_author: Optional[str] = None,
     edition: Optional[int] = None,
+    search_mode: Literal["regex", "prefix", "text"] = "regex",
+    sort_by: Literal["_id", "title", "author", "added_at", "available"] = "_id",
+    order: Literal["asc", "desc"] = "asc",
+    fields: Optional[str] = Query(None, description="Comma separated fields, or 'all'"),
 
 
     user = Depends(get_current_user), db=Depends(get_db)):
     try:
         if not await valid_user_check(user):
             raise HTTPException(status_code=403, detail="Access forbidden: Invalid user role")
-        
-        
-        query = {}
-    
-        # 🔹 Cursor pagination
-        if cursor:
-            if not ObjectId.is_valid(cursor):
-                raise HTTPException(status_code=400, detail="Invalid cursor")
-            query["_id"] = {"$gt": ObjectId(cursor)}
-    
+
+        # 🔹 Page cache + conditional GET, both keyed on the catalog version
+        version = await get_catalog_version()
+        headers = {}
+        if version is not None:
+            # The URL identifies the filter set, so the version alone is enough for the tag
+            etag = f'W/"catalog-{version}"'
+            headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
+        cache_key = page_cache_key({
+            "cursor": cursor,
+            "limit": limit,
+            "book_type": sorted(book_type) if book_type else None,
+            "book_name": book_name,
+            "book_author": book_author,
+            "edition": edition,
+            "search_mode": search_mode,
+            "sort_by": sort_by,
+            "order": order,
+            "fields": fields,
+        })
+        if version is not None:
+            cached = get_page(version, cache_key)
+            if cached is not None:
+                return FastJSONResponse(cached, headers=headers)
+
+        # 🔹 Projection, compact listing unless asked otherwise
+        try:
+            selected_fields = parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
         # 🔹 Filters
+        query = build_search_filter(search_mode, book_name, book_author)
+
         if book_type:
             query["category"] = {"$in": book_type}
             # query["category"] = {"$in": [book_type]}
-    
-        if book_name:
-            query["title"] = {"$regex": book_name, "$options": "i"}
-    
-        if book_author:
-            query["author"] = {"$regex": book_author, "$options": "i"}
 
         if edition:
             query["edition"] = edition
-    
-        books_collection = (
-            await db["books"]
-            .find(query)
-            .sort("_id", 1)
-            .limit(limit)
-            .to_list(limit)
-        )
 
-        next_cursor = str(books_collection[-1]["_id"]) if books_collection else None
+        is_text = "$text" in query
+        # 🔹 Text search is always ordered by relevance
+        sort_key, sort_order = ("score", "desc") if is_text else (sort_by, order)
+
+        projection = None
+        if selected_fields is not None:
+            # The sort key is needed for the next cursor even if not requested
+            projection = {field: 1 for field in selected_fields}
+            if sort_key not in ("_id", "score"):
+                projection[sort_key] = 1
+
+        # 🔹 Keyset pagination, (sort key, _id) compared against the cursor
+        keyset = None
+        if cursor:
+            if not is_text and sort_by == "_id" and order == "asc" and ObjectId.is_valid(cursor):
+                # Raw ObjectId cursors from older clients
+                keyset = {"_id": {"$gt": ObjectId(cursor)}}
+            else:
+                parsed = decode_cursor(cursor, sort_key, sort_order)
+                if not parsed:
+                    raise HTTPException(status_code=400, detail="Invalid cursor")
+                keyset = keyset_filter(sort_key, sort_order, parsed["v"], parsed["id"])
+
+        # 🔹 limit + 1 rows so hasMore is exact
+        if is_text:
+            pipeline = [
+                {"$match": query},
+                {"$addFields": {"score": {"$meta": "textScore"}}},
+            ]
+            if keyset:
+                pipeline.append({"$match": keyset})
+            pipeline += [{"$sort": dict(sort_spec(sort_key, sort_order))}, {"$limit": limit + 1}]
+            if projection:
+                pipeline.append({"$project": {**projection, "score": 1}})
+            books_collection = await db["books"].aggregate(pipeline).to_list(limit + 1)
+        else:
+            if keyset:
+                query = {"$and": [query, keyset]} if query else keyset
+            books_collection = (
+                await db["books"]
+                .find(query, projection)
+                .sort(sort_spec(sort_key, sort_order))
+                .limit(limit + 1)
+                .to_list(limit + 1)
+            )
+
+        has_more = len(books_collection) > limit
+        books_collection = books_collection[:limit]
+        next_cursor = encode_cursor(sort_key, sort_order, books_collection[-1]) if has_more else None
+
+        if selected_fields is not None and sort_key not in selected_fields and sort_key not in ("_id", "score"):
+            for book in books_collection:
+                book.pop(sort_key, None)
 
         # books_collection = db['books']
         # books = await books_collection.find().to_list(1000)   # Fetch up to 1000 books
-        books = [serialize_book(book) for book in books_collection]
-        if len(books) == 0:
-            books = []
-        return {
+        books = books_collection
+        result = {
                 "status": "success", 
                 "filters": {
                     "category": book_type,
                     "edition": edition,
                     "book_name": book_name,
-                    "book_author": book_author
+                    "book_author": book_author,
+                    "search_mode": search_mode,
+                    "sort_by": sort_key,
+                    "order": sort_order,
+                    "fields": selected_fields or "all"
                 },
                 "nextCursor": next_cursor,
-                "hasMore": len(books) == limit,
+                "hasMore": has_more,
                 "total books":len(books), 
                 "data": books
             }
+        if version is not None:
+            set_page(version, cache_key, result)
+        return FastJSONResponse(result, headers=headers)
     except HTTPException:
         raise
     except Exception:
@@ -90,27 +168,114 @@ async def get_all_books(
     
 
 @router.get("/details/{book_id}")
-async def get_book_details(book_id: str, is_user_valid = Depends(valid_user_check), db=Depends(get_db)):
+async def get_book_details(book_id: str, request: Request, is_user_valid = Depends(valid_user_check), db=Depends(get_db)):
     try:
         if not is_user_valid:
             raise HTTPException(status_code=403, detail="Access forbidden: Invalid user role")
         
         if not ObjectId.is_valid(book_id):
             raise HTTPException(status_code=400, detail="Invalid book ID")
+
+        # 🔹 Conditional GET on the per-book version, before any Mongo read
+        version = await get_book_version(book_id)
+        headers = {}
+        if version is not None:
+            etag = f'W/"book-{book_id}-{version}"'
+            headers = {"ETag": etag, "Cache-Control": CATALOG_CACHE_CONTROL}
+            if etag_matches(request.headers.get("if-none-match"), etag):
+                return Response(status_code=304, headers=headers)
         
-        book = await db["books"].find_one({"_id": ObjectId(book_id)})
+        # Same version as the ETag, so the body can never be older than its tag
+        book = await get_book_cached(db, book_id, version)
         
         if not book:
             raise HTTPException(status_code=404, detail="Book not found")
         
-        return {
+        return FastJSONResponse({
             "status": "success",
-            "data": serialize_book(book)
-        }
+            "data": book
+        }, headers=headers)
     except HTTPException:
         raise
     except Exception:
         traceback.print_exc()
         raise HTTPException(status_code=500, detail="An error occurred while fetching book details")
-    
 
+
+@router.get("/facets")
+async def get_book_facets(
+    book_type: Optional[List[str]] = Query(None),
+    book_name: Optional[str] = None,
+    book_author: Optional[str] = None,
+    edition: Optional[int] = None,
+    search_mode: Literal["regex", "prefix", "text"] = "regex",
+    user = Depends(get_current_user), db=Depends(get_db)):
+    try:
+        if not await valid_user_check(user):
+            raise HTTPException(status_code=403, detail="Access forbidden: Invalid user role")
+
+        version = await get_catalog_version()
+        cache_key = page_cache_key({
+            "facets": True,
+            "book_type": sorted(book_type) if book_type else None,
+            "book_name": book_name,
+            "book_author": book_author,
+            "edition": edition,
+            "search_mode": search_mode,
+        })
+        if version is not None:
+            cached = get_page(version, cache_key)
+            if cached is not None:
+                return FastJSONResponse(cached)
+
+        # 🔹 Each facet ignores its own filter, so the UI can show the
+        # counts of the other options next to the selected ones
+        category_match = {"category": {"$in": book_type}} if book_type else {}
+        edition_match = {"edition": edition} if edition else {}
+
+        pipeline = [
+            {"$match": build_search_filter(search_mode, book_name, book_author)},
+            {"$facet": {
+                "category": [
+                    {"$match": edition_match},
+                    {"$unwind": "$category"},
+                    {"$group": {"_id": "$category", "count": {"$sum": 1}}},
+                ],
+                "edition": [
+                    {"$match": category_match},
+                    {"$group": {"_id": "$edition", "count": {"$sum": 1}}},
+                    {"$sort": {"_id": 1}},
+                ],
+                "total": [
+                    {"$match": {**category_match, **edition_match}},
+                    {"$count": "count"},
+                ],
+            }},
+        ]
+        facets = (await db["books"].aggregate(pipeline).to_list(1))[0]
+
+        category_counts = {row["_id"]: row["count"] for row in facets["category"]}
+        for cat in BookCategori:
+            category_counts.setdefault(cat.value, 0)
+
+        result = {
+            "status": "success",
+            "filters": {
+                "category": book_type,
+                "edition": edition,
+                "book_name": book_name,
+                "book_author": book_author,
+                "search_mode": search_mode
+            },
+            "total": facets["total"][0]["count"] if facets["total"] else 0,
+            "category": category_counts,
+            "edition": [{"edition": row["_id"], "count": row["count"]} for row in facets["edition"]],
+        }
+        if version is not None:
+            set_page(version, cache_key, result)
+        return FastJSONResponse(result)
+    except HTTPException:
+        raise
+    except Exception:
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail="An error occurred while fetching book facets")
@@ -9,7 +9,9 @@ from models.books_model import BookCategori
 from authentication.auth_function import get_current_user
 from db_connection.db_provider import get_db
 from models.books_model import request_Book
-from routers.admin_routers import fetch_popular_books, fetch_students_data, fetch_books_data
+from utility.responses import FastJSONResponse
+from routers.admin_routers import fetch_dashboard_snapshot
+from utility.library_stats import inc_stats
 
 
 router = APIRouter()
@@ -56,6 +58,7 @@ async def book_request(
             "request_date": datetime.utcnow(),
             "status": "requested"
         })
+        await inc_stats(db, pending_requests=1)
 
         return {
             "status": "success",
@@ -93,17 +96,12 @@ async def my_requests(
                 request["book_name"] = book.get("title")
                 request["author"] = book.get("author")
                 request["edition"] = book.get("edition")
-        
-        requests = []
-        for request in requests_list:
-            request["_id"] = str(request["_id"])
-            request["book_id"] = str(request["book_id"])
-            requests.append(request)
 
-        return {
+
+        return FastJSONResponse({
             "status": "success",
-            "data": requests
-        }
+            "data": requests_list
+        })
 
     except HTTPException:
         raise
@@ -138,17 +136,12 @@ async def issued_books(
                 record["book_name"] = book.get("title")
                 record["author"] = book.get("author")
                 record["edition"] = book.get("edition")
-        
-        issued_books = []
-        for record in issued_list:
-            record["_id"] = str(record["_id"])
-            record["book_id"] = str(record["book_id"])
-            issued_books.append(record)
 
-        return {
+
+        return FastJSONResponse({
             "status": "success",
-            "data": issued_books
-        }
+            "data": issued_list
+        })
 
     except HTTPException:
         raise
@@ -187,6 +180,7 @@ async def delete_issued_request(request_id: str,
 
         if result.deleted_count == 0:
             raise HTTPException(status_code=404, detail="Request not found or cannot be deleted")
+        await inc_stats(db, pending_requests=-1)
 
         return {
             "status": "success",
@@ -238,7 +232,8 @@ async def return_book(issued_id: str,
         }, {
             "$set": {
                 "status": "return_requested",
-                "previous_status": prev_res["status"]
+                "previous_status": prev_res["status"],
+                "return_request_date": datetime.utcnow()
             }
         })
 
@@ -288,16 +283,13 @@ async def list_return_request(
                 record["author"] = book.get("author")
                 record["edition"] = book.get("edition")
 
-            record["_id"] = str(record["_id"])
-            record["book_id"] = str(record["book_id"])
-
             result.append(record)
 
-        return {
+        return FastJSONResponse({
             "status": "success",
             "data": result,
             "message": "Return requests fetched successfully"
-        }
+        })
 
     except HTTPException:
         raise
@@ -350,7 +342,8 @@ async def delete_return_request(issued_id: str,
             "$set": {
                 "status": prev_res["previous_status"],
                 "previous_status" : None
-            }
+            },
+            "$unset": {"return_request_date": ""}
         })
 
 
@@ -410,7 +403,8 @@ async def book_renew_request(issued_id: str,
         },{
             "$set": {
                 "status": "renew_requested",
-                "previous_status": prev_res["status"]
+                "previous_status": prev_res["status"],
+                "renew_request_date": datetime.utcnow()
             }
         })
 
@@ -470,7 +464,8 @@ async def delete_renew_request(issued_id: str,
             "$set": {
                 "status": prev_res["previous_status"],
                 "previous_status" : None
-            }
+            },
+            "$unset": {"renew_request_date": ""}
         })
 
         return {
@@ -502,17 +497,15 @@ async def student_dashboard(
         if not email:
             raise HTTPException(status_code=400, detail="Email missing")
         
-        books_details = await fetch_books_data(db)
-        student_details = await fetch_students_data(db)
-        popular_books = await fetch_popular_books(db)
+        snapshot = await fetch_dashboard_snapshot(db)
 
         return {
             "status": "success",
-            "total_books": books_details["total_books"],
-            "total_students": student_details,
-            "popular_books": popular_books,
-            "total_issued_books": books_details["total_issued_books"],
-            "books_percentage_change": books_details["books_percentage_change"],
+            "total_books": snapshot["total_books"],
+            "total_students": snapshot["total_students"],
+            "popular_books": snapshot["popular_books"],
+            "total_issued_books": snapshot["total_issued_books"],
+            "books_percentage_change": snapshot["books_percentage_change"],
             "message": "Dashboard data fetched successfully"
         }
 
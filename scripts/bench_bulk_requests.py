@@ -0,0 +1,120 @@
+"""
+Bulk request actions vs the single-item endpoint.
+
+Seeds a throwaway database with books and pending "requested" rows, then
+approves all of them twice: once through approve_book_request, one call per
+request as the admin desk does today, and once through
+apply_request_actions in BULK_MAX_ITEMS sized batches (what
+/admin/bulk-request-actions runs).
+
+    python scripts/bench_bulk_requests.py --requests 2000 --books 200
+
+Uses DB_URI from the environment and writes to BENCH_DB_NAME
+(default "library_bench"); its books/issued_books/library_stats collections
+are dropped before each run. Redis is optional: cache invalidation fails
+open, so run with or without it to see its share of the single-item cost.
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from db_connection.indexes import ensure_indexes
+from models.books_model import approve_Reject_Book_Request
+from routers.admin_routers import approve_book_request
+from utility.request_actions import apply_request_actions, BULK_MAX_ITEMS
+
+load_dotenv()
+
+
+async def seed(db, requests: int, books: int) -> list:
+    for name in ("books", "issued_books", "library_stats"):
+        await db[name].drop()
+    await ensure_indexes(db)
+
+    # Enough stock that every approval succeeds in both runs
+    per_book = requests // books + 1
+    result = await db.books.insert_many([{
+        "title": f"Bench Book {i}",
+        "author": f"Author {i % 50}",
+        "edition": 1,
+        "quantity": per_book,
+        "available": per_book,
+        "added_at": datetime.utcnow(),
+    } for i in range(books)])
+    book_ids = result.inserted_ids
+
+    result = await db.issued_books.insert_many([{
+        "email": f"student{i}@example.com",
+        "book_id": random.choice(book_ids),
+        "issue_date": None,
+        "return_date": None,
+        "request_date": datetime.utcnow(),
+        "status": "requested",
+    } for i in range(requests)])
+    return [str(oid) for oid in result.inserted_ids]
+
+
+async def run_single(db, request_ids: list) -> float:
+    start = time.perf_counter()
+    for request_id in request_ids:
+        await approve_book_request(
+            approve_Reject_Book_Request(request_id=request_id, action="approved"),
+            is_admin=True,
+            db=db,
+        )
+    return time.perf_counter() - start
+
+
+async def run_bulk(db, request_ids: list) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(request_ids), BULK_MAX_ITEMS):
+        batch = request_ids[offset:offset + BULK_MAX_ITEMS]
+        results = await apply_request_actions(db, [(request_id, "approved") for request_id in batch])
+        failed = [r for r in results if r["status"] != "success"]
+        if failed:
+            print(f"  {len(failed)} failed, first: {failed[0]['message']}")
+    return time.perf_counter() - start
+
+
+async def check(db, requests: int):
+    # Both paths must leave the same state behind
+    approved = await db.issued_books.count_documents({"status": "approved"})
+    stock = await db.books.aggregate([
+        {"$group": {"_id": None, "quantity": {"$sum": "$quantity"}, "available": {"$sum": "$available"}}}
+    ]).to_list(1)
+    out = stock[0]["quantity"] - stock[0]["available"]
+    print(f"  approved {approved}/{requests}, books out {out}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--books", type=int, default=200)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.getenv("DB_URI"))
+    db = client[os.getenv("BENCH_DB_NAME", "library_bench")]
+
+    timings = {}
+    for label, run in (("single-item", run_single), ("bulk", run_bulk)):
+        request_ids = await seed(db, args.requests, args.books)
+        elapsed = await run(db, request_ids)
+        timings[label] = elapsed
+        print(f"{label:<12} {elapsed:8.2f} s   {args.requests / elapsed:10.1f} requests/s")
+        await check(db, args.requests)
+
+    print(f"speedup x{timings['single-item'] / timings['bulk']:.1f}")
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
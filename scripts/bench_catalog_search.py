@@ -0,0 +1,121 @@
+"""
+Catalog search benchmark: regex vs prefix vs text on a synthetic catalog.
+
+Seeds a throwaway database (default 500,000 books), builds the search
+indexes from db_connection.indexes and times the /books/all query for
+each search mode, together with the documents examined per query.
+
+    python scripts/bench_catalog_search.py --books 500000 --runs 20
+
+Uses DB_URI from the environment and writes to BENCH_DB_NAME
+(default "library_bench"), which is dropped first unless --keep is given.
+"""
+import argparse
+import asyncio
+import os
+import random
+import string
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+from db_connection.indexes import ensure_indexes
+from utility.book_search import build_search_filter, search_fields
+
+load_dotenv()
+
+CATEGORIES = ["mathematics", "computer_science", "physics", "literature", "others"]
+WORDS = [
+    "introduction", "advanced", "theory", "principles", "applied", "modern", "classical",
+    "algorithms", "systems", "analysis", "quantum", "linear", "algebra", "calculus",
+    "networks", "poetry", "history", "design", "mechanics", "statistics", "data",
+]
+
+
+def random_name() -> str:
+    return "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 9))).title()
+
+
+def make_book() -> dict:
+    title = " ".join(random.choices(WORDS, k=random.randint(2, 5))).title()
+    author = f"{random_name()} {random_name()}"
+    quantity = random.randint(1, 10)
+    book = {
+        "title": title,
+        "author": author,
+        "description": " ".join(random.choices(WORDS, k=60)),
+        "edition": random.randint(1, 8),
+        "quantity": quantity,
+        "available": quantity,
+        "category": random.sample(CATEGORIES, k=random.randint(1, 2)),
+        "added_at": datetime.utcnow(),
+    }
+    book.update(search_fields(title, author))
+    return book
+
+
+async def seed(db, total: int, batch: int = 10000):
+    start = time.perf_counter()
+    for offset in range(0, total, batch):
+        await db.books.insert_many([make_book() for _ in range(min(batch, total - offset))], ordered=False)
+    print(f"Seeded {total} books in {time.perf_counter() - start:.1f}s")
+
+
+async def time_mode(db, mode: str, name: str, author: str | None, runs: int, limit: int = 20):
+    query = build_search_filter(mode, name, author)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        if mode == "text":
+            await db.books.aggregate([
+                {"$match": query},
+                {"$addFields": {"score": {"$meta": "textScore"}}},
+                {"$sort": {"score": -1, "_id": 1}},
+                {"$limit": limit},
+            ]).to_list(limit)
+        else:
+            await db.books.find(query).sort("_id", 1).limit(limit).to_list(limit)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    explain = await db.command(
+        "explain",
+        {"find": "books", "filter": query, "sort": {"_id": 1}, "limit": limit},
+        verbosity="executionStats",
+    ) if mode != "text" else None
+    examined = explain["executionStats"]["totalDocsExamined"] if explain else "-"
+
+    timings.sort()
+    p50 = timings[len(timings) // 2]
+    p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+    print(f"{mode:>7} | {name!r:>14} | p50 {p50:8.2f} ms | p95 {p95:8.2f} ms | docs examined {examined}")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--books", type=int, default=500000)
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="reuse an already seeded database")
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.getenv("DB_URI"))
+    db = client[os.getenv("BENCH_DB_NAME", "library_bench")]
+
+    if not args.keep:
+        await db.books.drop()
+        await seed(db, args.books)
+    await ensure_indexes(db)
+
+    for term in ("algo", "quantum mech", "zz"):
+        for mode in ("regex", "prefix", "text"):
+            await time_mode(db, mode, term, None, args.runs)
+
+    client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
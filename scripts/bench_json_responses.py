@@ -0,0 +1,106 @@
+"""
+Serialization cost of the old response path vs FastJSONResponse.
+
+Old path: stringify ObjectIds by hand, FastAPI's jsonable_encoder, stdlib
+json (what JSONResponse.render does). New path: FastJSONResponse.render on
+the raw Mongo-shaped documents.
+
+    python scripts/bench_json_responses.py --runs 200
+
+Payloads: a 50-book /books/all page and a 5,000-row admin request listing.
+No database needed; the documents are synthetic.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from utility.responses import FastJSONResponse
+
+CATEGORIES = ["mathematics", "computer_science", "physics", "literature", "others"]
+
+
+def book_page(rows: int) -> dict:
+    books = [{
+        "_id": ObjectId(),
+        "title": f"Book {i}",
+        "author": f"Author {i % 97}",
+        "description": "lorem ipsum " * 40,
+        "edition": random.randint(1, 8),
+        "quantity": 5,
+        "available": random.randint(0, 5),
+        "category": random.sample(CATEGORIES, 2),
+        "added_at": datetime.utcnow(),
+    } for i in range(rows)]
+    return {"status": "success", "nextCursor": None, "hasMore": False, "data": books}
+
+
+def admin_listing(rows: int) -> dict:
+    now = datetime.utcnow()
+    result = [{
+        "id": ObjectId(),
+        "student_email": f"student{i}@example.com",
+        "book_title": f"Book {i % 500}",
+        "book_author": f"Author {i % 97}",
+        "issue_date": now,
+        "return_date": now + timedelta(days=3),
+        "request_date": now - timedelta(days=1),
+        "status": "requested",
+    } for i in range(rows)]
+    return {"total_requests": rows, "requests": result, "message": "Successfull"}
+
+
+def stringify(content: dict) -> dict:
+    # What handlers did by hand before: str() every ObjectId
+    for key in ("data", "requests"):
+        for row in content.get(key, []):
+            for field, value in row.items():
+                if isinstance(value, ObjectId):
+                    row[field] = str(value)
+    return content
+
+
+def old_path(content: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(stringify(content))).body
+
+
+def new_path(content: dict) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def bench(name: str, make, runs: int):
+    results = {}
+    for label, render in (("jsonable_encoder + json", old_path), ("FastJSONResponse", new_path)):
+        timings = []
+        size = 0
+        for _ in range(runs):
+            content = make()
+            start = time.perf_counter()
+            size = len(render(content))
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        results[label] = timings[len(timings) // 2]
+        print(f"{name:<22} {label:<24} p50 {results[label]:8.3f} ms   {size / 1024:8.1f} KiB")
+    speedup = results["jsonable_encoder + json"] / results["FastJSONResponse"]
+    print(f"{'':<22} speedup x{speedup:.1f}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    bench("50-book page", lambda: book_page(50), args.runs)
+    bench("5,000-row admin list", lambda: admin_listing(5000), max(10, args.runs // 10))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Cold-start import report for the API.
+
+Runs `python -X importtime -c "import main"` in a fresh interpreter and
+prints the slowest modules by cumulative import time.
+
+    python scripts/import_time_report.py --top 25 --max-ms 1500
+
+With --max-ms the script exits non-zero when the total import time of
+`main` exceeds the budget, so CI can track cold-start regressions.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_importtime(module: str) -> list[tuple[int, int, str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        print(proc.stderr, file=sys.stderr)
+        sys.exit(proc.returncode)
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("--max-ms", type=float, default=None)
+    args = parser.parse_args()
+
+    rows = run_importtime(args.module)
+    total_ms = next((cum for _, cum, name in rows if name.strip() == args.module), 0) / 1000
+
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for self_us, cumulative_us, name in sorted(rows, key=lambda r: r[1], reverse=True)[:args.top]:
+        print(f"{cumulative_us / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    print(f"\nTotal import time of '{args.module}': {total_ms:.1f} ms")
+
+    if args.max_ms is not None and total_ms > args.max_ms:
+        print(f"Import time budget exceeded ({total_ms:.1f} ms > {args.max_ms} ms)", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
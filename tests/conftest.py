@@ -0,0 +1,156 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class StubOAuthServer:
+    """
+    Local stand-in for Google's token/certs endpoints and GitHub's token/API
+    endpoints. Tests fill in the responses and read the counters.
+    """
+
+    def __init__(self):
+        self.certs = {}
+        self.certs_max_age = 3600
+        self.google_token = {}
+        self.github_token = {}
+        self.github_user = {}
+        self.github_emails = []
+        self.api_delay = 0.0
+        self.hits = {}
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.url = f"http://127.0.0.1:{self._server.server_port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, body, headers=None):
+                payload = json.dumps(body).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def _count(self):
+                with stub._lock:
+                    stub.hits[self.path] = stub.hits.get(self.path, 0) + 1
+
+            def do_GET(self):
+                self._count()
+                if self.path == "/google/certs":
+                    return self._send(stub.certs, {"Cache-Control": f"public, max-age={stub.certs_max_age}"})
+                if self.path in ("/github/api/user", "/github/api/user/emails"):
+                    with stub._lock:
+                        stub.in_flight += 1
+                        stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    time.sleep(stub.api_delay)
+                    with stub._lock:
+                        stub.in_flight -= 1
+                    return self._send(stub.github_user if self.path.endswith("/user") else stub.github_emails)
+                self.send_error(404)
+
+            def do_POST(self):
+                self._count()
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                if self.path == "/google/token":
+                    return self._send(stub.google_token)
+                if self.path == "/github/token":
+                    return self._send(stub.github_token)
+                self.send_error(404)
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class SMTPSink:
+    """
+    Minimal SMTP server that accepts every message and keeps it. Runs on the
+    test's own event loop: `await sink.start()` inside the test coroutine.
+    `delay` slows each DATA reply; `fail_first` rejects that many messages.
+    """
+
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+        self.delay = 0.0
+        self.fail_first = 0
+        self.port = None
+        self._server = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._session, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        await self._server.wait_closed()
+
+    async def _session(self, reader, writer):
+        self.connections += 1
+
+        def reply(line):
+            writer.write(f"{line}\r\n".encode())
+
+        reply("220 sink ESMTP")
+        try:
+            while line := await reader.readline():
+                command = line.decode().strip().upper()
+                if command.startswith(("EHLO", "HELO")):
+                    reply("250-sink")
+                    reply("250 8BITMIME")
+                elif command == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    data = await reader.readuntil(b"\r\n.\r\n")
+                    await asyncio.sleep(self.delay)
+                    if self.fail_first > 0:
+                        self.fail_first -= 1
+                        reply("451 Try again later")
+                    else:
+                        self.messages.append(data.decode())
+                        reply("250 Queued")
+                elif command == "QUIT":
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:
+                    # MAIL, RCPT, RSET, NOOP
+                    reply("250 OK")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+@pytest.fixture
+def smtp_sink():
+    return SMTPSink()
+
+
+@pytest.fixture
+def oauth_stub():
+    stub = StubOAuthServer()
+    stub.start()
+    yield stub
+    stub.stop()
@@ -0,0 +1,160 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("httpx")
+pytest.importorskip("google.auth")
+pytest.importorskip("cryptography")
+
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt as google_jwt
+
+from authentication import oauth_client
+from utility.http_client import close_http_client
+
+CLIENT_ID = "test-client.apps.googleusercontent.com"
+KEY_ID = "stub-key-1"
+
+
+def make_signing_key():
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "stub-oauth")])
+    now = datetime.now(timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - timedelta(days=1))
+        .not_valid_after(now + timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    private_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    cert_pem = cert.public_bytes(serialization.Encoding.PEM).decode()
+    return crypt.RSASigner.from_string(private_pem, key_id=KEY_ID), cert_pem
+
+
+SIGNER, CERT_PEM = make_signing_key()
+
+
+def id_token(**overrides) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": "1234567890",
+        "email": "student@example.com",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    payload.update(overrides)
+    return google_jwt.encode(SIGNER, payload).decode()
+
+
+def run(coro):
+    # Each test gets its own loop; the shared httpx client must not outlive it
+    async def wrapper():
+        try:
+            return await coro
+        finally:
+            await close_http_client()
+    return asyncio.run(wrapper())
+
+
+@pytest.fixture(autouse=True)
+def stub_urls(oauth_stub, monkeypatch):
+    oauth_stub.certs = {KEY_ID: CERT_PEM}
+    monkeypatch.setattr(oauth_client, "GOOGLE_TOKEN_URL", f"{oauth_stub.url}/google/token")
+    monkeypatch.setattr(oauth_client, "GOOGLE_CERTS_URL", f"{oauth_stub.url}/google/certs")
+    monkeypatch.setattr(oauth_client, "GITHUB_TOKEN_URL", f"{oauth_stub.url}/github/token")
+    monkeypatch.setattr(oauth_client, "GITHUB_API_URL", f"{oauth_stub.url}/github/api")
+    monkeypatch.setitem(oauth_client._google_certs, "certs", None)
+    monkeypatch.setitem(oauth_client._google_certs, "expires_at", 0.0)
+
+
+def test_google_exchange_and_verify_valid_token(oauth_stub):
+    oauth_stub.google_token = {"access_token": "ya29.stub", "id_token": id_token()}
+
+    async def flow():
+        token = await oauth_client.google_exchange_code("auth-code", "http://localhost/callback")
+        return await oauth_client.google_verify_id_token(token["id_token"], CLIENT_ID)
+
+    idinfo = run(flow())
+    assert idinfo["email"] == "student@example.com"
+    assert oauth_stub.hits["/google/token"] == 1
+
+
+def test_google_rejects_wrong_audience(oauth_stub):
+    token = id_token(aud="someone-else.apps.googleusercontent.com")
+    with pytest.raises(ValueError):
+        run(oauth_client.google_verify_id_token(token, CLIENT_ID))
+
+
+def test_google_rejects_wrong_issuer(oauth_stub):
+    token = id_token(iss="https://evil.example.com")
+    with pytest.raises(ValueError, match="Wrong issuer"):
+        run(oauth_client.google_verify_id_token(token, CLIENT_ID))
+
+
+def test_google_rejects_expired_token(oauth_stub):
+    now = int(time.time())
+    # Well past the 10 s clock skew allowance
+    token = id_token(iat=now - 7200, exp=now - 3600)
+    with pytest.raises(ValueError):
+        run(oauth_client.google_verify_id_token(token, CLIENT_ID))
+
+
+def test_google_accepts_token_within_clock_skew(oauth_stub):
+    now = int(time.time())
+    token = id_token(iat=now - 3600, exp=now - 5)
+    assert run(oauth_client.google_verify_id_token(token, CLIENT_ID))["sub"] == "1234567890"
+
+
+def test_google_certs_cached_until_max_age(oauth_stub, monkeypatch):
+    oauth_stub.certs_max_age = 60
+    token = id_token()
+    # Only the cache's view of time moves; token validation uses the real clock
+    clock = {"now": time.time()}
+    monkeypatch.setattr(oauth_client, "time", type("FakeTime", (), {"time": staticmethod(lambda: clock["now"])}))
+
+    async def verify_twice():
+        await oauth_client.google_verify_id_token(token, CLIENT_ID)
+        await oauth_client.google_verify_id_token(token, CLIENT_ID)
+
+    run(verify_twice())
+    assert oauth_stub.hits["/google/certs"] == 1
+
+    # Past max-age the next verification refetches the certs
+    clock["now"] += 61
+    run(oauth_client.google_verify_id_token(token, CLIENT_ID))
+    assert oauth_stub.hits["/google/certs"] == 2
+
+
+def test_github_profile_fetches_user_and_emails_concurrently(oauth_stub):
+    oauth_stub.github_token = {"access_token": "gho_stub", "token_type": "bearer"}
+    oauth_stub.github_user = {"login": "octo", "name": "Octo Cat", "email": None}
+    oauth_stub.github_emails = [{"email": "octo@example.com", "primary": True, "verified": True}]
+    oauth_stub.api_delay = 0.3
+
+    async def flow():
+        token = await oauth_client.github_exchange_code("auth-code", "http://localhost/callback")
+        return await oauth_client.github_fetch_profile(token["access_token"])
+
+    user, emails = run(flow())
+    assert user["login"] == "octo"
+    assert emails[0]["email"] == "octo@example.com"
+    # Both API calls were open on the stub at the same time
+    assert oauth_stub.max_in_flight == 2
+    assert oauth_stub.hits["/github/api/user"] == 1
+    assert oauth_stub.hits["/github/api/user/emails"] == 1
@@ -0,0 +1,154 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("pymongo")
+pytest.importorskip("redis")
+
+from bson import ObjectId
+
+from utility import request_actions
+from utility.request_actions import apply_request_actions
+
+
+def _matches(doc: dict, query: dict) -> bool:
+    for field, cond in query.items():
+        value = doc.get(field)
+        if isinstance(cond, dict):
+            if "$in" in cond and value not in cond["$in"]:
+                return False
+            if "$gte" in cond and not (value is not None and value >= cond["$gte"]):
+                return False
+        elif value != cond:
+            return False
+    return True
+
+
+class FakeCollection:
+    """The slice of a Motor collection apply_request_actions uses, in memory."""
+
+    def __init__(self, docs):
+        self.docs = {doc["_id"]: dict(doc) for doc in docs}
+        self.fail_bulk_after = None     # apply this many ops, then raise
+        self.before_update_one = None   # hook to simulate a concurrent writer
+
+    def find(self, query, projection=None):
+        docs = [dict(doc) for doc in self.docs.values() if _matches(doc, query)]
+        return SimpleNamespace(to_list=lambda length: asyncio.sleep(0, docs))
+
+    def _apply(self, query, update) -> bool:
+        for doc in self.docs.values():
+            if _matches(doc, query):
+                doc.update(update.get("$set", {}))
+                for field, delta in update.get("$inc", {}).items():
+                    doc[field] = doc.get(field, 0) + delta
+                return True
+        return False
+
+    async def update_one(self, query, update):
+        if self.before_update_one:
+            self.before_update_one()
+        return SimpleNamespace(matched_count=int(self._apply(query, update)))
+
+    async def bulk_write(self, operations, ordered=True):
+        matched = 0
+        for n, op in enumerate(operations):
+            if self.fail_bulk_after is not None and n >= self.fail_bulk_after:
+                raise RuntimeError("write concern timeout")
+            matched += self._apply(op._filter, op._doc)
+        return SimpleNamespace(matched_count=matched)
+
+
+@pytest.fixture
+def library(monkeypatch):
+    async def noop(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(request_actions, "catalog_changed", noop)
+    monkeypatch.setattr(request_actions, "inc_stats", noop)
+
+    book, other_book = ObjectId(), ObjectId()
+    requests = [
+        {"_id": ObjectId(), "book_id": book, "status": "requested", "return_date": None},
+        {"_id": ObjectId(), "book_id": book, "status": "requested", "return_date": None},
+        {"_id": ObjectId(), "book_id": other_book, "status": "return_requested", "return_date": None},
+    ]
+    db = SimpleNamespace(
+        books=FakeCollection([{"_id": book, "available": 3}, {"_id": other_book, "available": 0}]),
+        issued_books=FakeCollection(requests),
+    )
+    items = [
+        (str(requests[0]["_id"]), "approved"),
+        (str(requests[1]["_id"]), "approved"),
+        (str(requests[2]["_id"]), "returned"),
+    ]
+    return SimpleNamespace(db=db, book=book, other_book=other_book, requests=requests, items=items)
+
+
+def available(library, book_id) -> int:
+    return library.db.books.docs[book_id]["available"]
+
+
+def test_applies_transitions_and_stock(library):
+    results = asyncio.run(apply_request_actions(library.db, library.items))
+
+    assert [r["status"] for r in results] == ["success"] * 3
+    assert available(library, library.book) == 1
+    assert available(library, library.other_book) == 1
+    statuses = [doc["status"] for doc in library.db.issued_books.docs.values()]
+    assert statuses == ["approved", "approved", "returned"]
+
+
+def test_failed_request_write_releases_reserved_stock(library):
+    library.db.issued_books.fail_bulk_after = 0
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(apply_request_actions(library.db, library.items))
+
+    # Reservation given back, nothing issued
+    assert available(library, library.book) == 3
+    assert available(library, library.other_book) == 0
+    assert all(doc["status"] != "approved" for doc in library.db.issued_books.docs.values())
+
+
+def test_partially_applied_request_write_keeps_landed_reservations(library):
+    # The first approval lands, then the write fails
+    library.db.issued_books.fail_bulk_after = 1
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(apply_request_actions(library.db, library.items))
+
+    first, second = (library.db.issued_books.docs[r["_id"]] for r in library.requests[:2])
+    assert first["status"] == "approved"
+    assert second["status"] == "requested"
+    # One copy stays out for the approval that landed, the other is released
+    assert available(library, library.book) == 2
+
+
+def test_concurrent_approval_fails_the_books_items(library):
+    # Another admin issues two copies between our read and the reservation
+    def concurrent_approval():
+        library.db.books.docs[library.book]["available"] = 1
+    library.db.books.before_update_one = concurrent_approval
+
+    results = asyncio.run(apply_request_actions(library.db, library.items))
+
+    assert [r["status"] for r in results] == ["failed", "failed", "success"]
+    assert results[0]["message"] == "Book not available for issuing"
+    assert available(library, library.book) == 1
+    assert available(library, library.other_book) == 1
+
+
+def test_request_changed_mid_batch_refunds_its_copy(library):
+    # A request the batch validated is cancelled before the write reaches it
+    def student_cancels():
+        library.db.issued_books.docs[library.requests[1]["_id"]]["status"] = "cancelled"
+    library.db.books.before_update_one = student_cancels
+
+    results = asyncio.run(apply_request_actions(library.db, library.items))
+
+    assert [r["status"] for r in results] == ["success", "failed", "success"]
+    assert results[1]["message"] == "Request changed while processing"
+    assert available(library, library.book) == 2
@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("fastapi")
+pytest.importorskip("aiosmtplib")
+
+from authentication import send_mail
+
+
+@pytest.fixture(autouse=True)
+def dispatcher(smtp_sink, monkeypatch):
+    monkeypatch.setenv("EMAIL_HOST", "127.0.0.1")
+    monkeypatch.setenv("EMAIL_FROM", "library@example.com")
+    monkeypatch.delenv("EMAIL_PASS", raising=False)
+    monkeypatch.setattr(send_mail, "MAIL_START_TLS", False)
+    monkeypatch.setattr(send_mail, "MAIL_WORKERS", 2)
+    monkeypatch.setattr(send_mail, "MAIL_RETRY_BASE", 0.01)
+    monkeypatch.setattr(send_mail, "_workers", [])
+    monkeypatch.setattr(send_mail, "_mail_queue", None)
+
+
+def run_with_sink(sink, monkeypatch, scenario):
+    async def wrapper():
+        await sink.start()
+        monkeypatch.setenv("EMAIL_PORT", str(sink.port))
+        try:
+            return await scenario()
+        finally:
+            await sink.stop()
+    return asyncio.run(wrapper())
+
+
+def test_queued_mail_is_delivered_over_pooled_connections(smtp_sink, monkeypatch):
+    async def scenario():
+        send_mail.start_mail_dispatcher()
+        for i in range(10):
+            await send_mail.send_mail_fast(f"student{i}@example.com", "123456")
+        await send_mail.stop_mail_dispatcher()
+
+    run_with_sink(smtp_sink, monkeypatch, scenario)
+    assert len(smtp_sink.messages) == 10
+    assert "Your Login mail is 123456" in smtp_sink.messages[0]
+    # Connections are reused across the batch, at most one per worker
+    assert smtp_sink.connections <= send_mail.MAIL_WORKERS
+
+
+def test_stop_drains_queue_before_cancelling_workers(smtp_sink, monkeypatch):
+    smtp_sink.delay = 0.05
+
+    async def scenario():
+        send_mail.start_mail_dispatcher()
+        for i in range(6):
+            await send_mail.send_mail_fast(f"student{i}@example.com", "654321")
+        # Shutdown starts while every mail is still queued or in flight
+        await send_mail.stop_mail_dispatcher()
+
+    run_with_sink(smtp_sink, monkeypatch, scenario)
+    assert len(smtp_sink.messages) == 6
+
+
+def test_stop_waits_for_mail_in_retry_backoff(smtp_sink, monkeypatch):
+    smtp_sink.fail_first = 1
+    monkeypatch.setattr(send_mail, "MAIL_RETRY_BASE", 0.2)
+
+    async def scenario():
+        send_mail.start_mail_dispatcher()
+        await send_mail.send_mail_fast("student@example.com", "111111")
+        await asyncio.sleep(0.05)   # first attempt rejected, now backing off
+        await send_mail.stop_mail_dispatcher()
+
+    run_with_sink(smtp_sink, monkeypatch, scenario)
+    assert len(smtp_sink.messages) == 1
+
+
+def test_stop_gives_up_after_drain_timeout(smtp_sink, monkeypatch):
+    # A full drain would take 4 mails x 2 s / 2 workers = 4 s
+    smtp_sink.delay = 2.0
+    monkeypatch.setattr(send_mail, "MAIL_DRAIN_TIMEOUT", 0.2)
+
+    async def scenario():
+        send_mail.start_mail_dispatcher()
+        for i in range(4):
+            await send_mail.send_mail_fast(f"student{i}@example.com", "222222")
+        start = time.perf_counter()
+        await send_mail.stop_mail_dispatcher()
+        return time.perf_counter() - start
+
+    elapsed = run_with_sink(smtp_sink, monkeypatch, scenario)
+    # Timeout plus at most the in-flight send the cancelled worker closes out
+    assert elapsed < 3.0
+    assert not send_mail._workers
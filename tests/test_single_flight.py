@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from utility.single_flight import single_flight, _inflight
+
+
+def test_concurrent_callers_share_one_load():
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "book"
+
+    async def scenario():
+        return await asyncio.gather(*[single_flight("k", loader) for _ in range(5)])
+
+    assert asyncio.run(scenario()) == ["book"] * 5
+    assert len(calls) == 1
+    assert not _inflight
+
+
+def test_follower_retries_when_leader_is_cancelled():
+    calls = []
+
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def scenario():
+        leader = asyncio.create_task(single_flight("k", loader))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(single_flight("k", loader))
+        await asyncio.sleep(0.01)
+        # The leader's client disconnects mid-load
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await follower
+
+    # The follower led a second load instead of inheriting the cancellation
+    assert asyncio.run(scenario()) == 2
+    assert len(calls) == 2
+    assert not _inflight
+
+
+def test_cancelled_follower_does_not_cancel_the_load():
+    async def loader():
+        await asyncio.sleep(0.05)
+        return "book"
+
+    async def scenario():
+        leader = asyncio.create_task(single_flight("k", loader))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(single_flight("k", loader))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(scenario()) == "book"
+
+
+def test_loader_error_reaches_every_caller():
+    async def loader():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("mongo down")
+
+    async def scenario():
+        return await asyncio.gather(*[single_flight("k", loader) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert not _inflight
@@ -0,0 +1,112 @@
+import orjson
+import os
+import time
+from collections import OrderedDict
+from bson import ObjectId
+from dotenv import load_dotenv
+
+from db_connection.redis_config import redis_client
+from utility.responses import dumps
+from utility.single_flight import single_flight
+
+load_dotenv()
+
+# Entries are tagged with the book version (book:version:{id}) they were
+# loaded under: L1 keeps it next to the book, L2 has it in the key. A reader
+# only accepts an entry for the version it just read, so neither another
+# worker's missed invalidation nor a load that raced an admin write and
+# re-filled the cache afterwards can serve a pre-write copy. Without a
+# version (Redis down) only L1 is used and its TTL bounds staleness.
+BOOK_CACHE_L1_SIZE = int(os.getenv("BOOK_CACHE_L1_SIZE", 2000))
+BOOK_CACHE_L1_TTL = float(os.getenv("BOOK_CACHE_L1_TTL", 5))
+BOOK_CACHE_L2_TTL = int(os.getenv("BOOK_CACHE_L2_TTL", 300))
+
+_l1 = OrderedDict()     # book_id -> (expires_at, version, book)
+_stats = {"l1_hits": 0, "l2_hits": 0, "misses": 0, "invalidations": 0}
+
+
+def serialize_book_doc(book: dict) -> dict:
+    # Same shape whether it came from Mongo or from a cache level
+    return orjson.loads(dumps(book))
+
+
+def _l1_get(book_id: str, version):
+    entry = _l1.get(book_id)
+    if entry is None:
+        return None
+    expires_at, entry_version, book = entry
+    if time.monotonic() >= expires_at or entry_version != version:
+        del _l1[book_id]
+        return None
+    _l1.move_to_end(book_id)
+    return book
+
+
+def _l1_set(book_id: str, version, book: dict):
+    _l1[book_id] = (time.monotonic() + BOOK_CACHE_L1_TTL, version, book)
+    _l1.move_to_end(book_id)
+    if len(_l1) > BOOK_CACHE_L1_SIZE:
+        _l1.popitem(last=False)
+
+
+async def _load(db, book_id: str, version) -> dict | None:
+    l2_key = f"book:{book_id}:{version}"
+    cached = None
+    if version is not None:
+        try:
+            cached = await redis_client.get(l2_key)
+        except Exception as e:
+            print("Redis Get Error:", e)
+
+    if cached:
+        _stats["l2_hits"] += 1
+        book = orjson.loads(cached)
+        _l1_set(book_id, version, book)
+        return book
+
+    _stats["misses"] += 1
+    doc = await db["books"].find_one({"_id": ObjectId(book_id)})
+    if not doc:
+        return None
+
+    book = serialize_book_doc(doc)
+    if version is not None:
+        # Written under the version read before the load, so a copy that
+        # raced a write lands on a key nobody asks for any more
+        try:
+            await redis_client.setex(l2_key, BOOK_CACHE_L2_TTL, dumps(book))
+        except Exception as e:
+            print("Redis Save Error:", e)
+    _l1_set(book_id, version, book)
+    return book
+
+
+async def get_book_cached(db, book_id: str, version) -> dict | None:
+    # `version` is get_book_version(book_id), read by the caller before this
+    book = _l1_get(book_id, version)
+    if book is not None:
+        _stats["l1_hits"] += 1
+        return book
+
+    # Stampede protection: concurrent misses for the same id share one load
+    return await single_flight(f"book:{book_id}:{version}", lambda: _load(db, book_id, version))
+
+
+async def invalidate_book(*book_ids):
+    # L2 needs no delete: the version bump that follows orphans the old key
+    for book_id in book_ids:
+        _l1.pop(str(book_id), None)
+    _stats["invalidations"] += len(book_ids)
+
+
+def book_cache_stats() -> dict:
+    total = _stats["l1_hits"] + _stats["l2_hits"] + _stats["misses"]
+    return {
+        "l1_size": len(_l1),
+        "l1_max_size": BOOK_CACHE_L1_SIZE,
+        "l1_hits": _stats["l1_hits"],
+        "l2_hits": _stats["l2_hits"],
+        "misses": _stats["misses"],
+        "invalidations": _stats["invalidations"],
+        "hit_rate": round((_stats["l1_hits"] + _stats["l2_hits"]) / total, 4) if total else 0.0,
+    }
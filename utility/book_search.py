@@ -0,0 +1,55 @@
+import re
+
+# regex  -> legacy case-insensitive substring match (collection scan)
+# prefix -> anchored match on the lowercased title_lower / author_lower fields (index range scan)
+# text   -> $text on the books text index, ordered by relevance
+SEARCH_MODES = ("regex", "prefix", "text")
+
+
+def search_fields(title: str | None = None, author: str | None = None) -> dict:
+    # Normalized copies kept next to title/author so prefix search can use an index
+    fields = {}
+    if title is not None:
+        fields["title_lower"] = title.strip().lower()
+    if author is not None:
+        fields["author_lower"] = author.strip().lower()
+    return fields
+
+
+def build_search_filter(mode: str, book_name: str | None, book_author: str | None) -> dict:
+    query = {}
+    if mode == "prefix":
+        if book_name:
+            query["title_lower"] = {"$regex": f"^{re.escape(book_name.strip().lower())}"}
+        if book_author:
+            query["author_lower"] = {"$regex": f"^{re.escape(book_author.strip().lower())}"}
+    elif mode == "text":
+        terms = " ".join(t for t in (book_name, book_author) if t)
+        if terms:
+            query["$text"] = {"$search": terms}
+    else:
+        if book_name:
+            query["title"] = {"$regex": book_name, "$options": "i"}
+        if book_author:
+            query["author"] = {"$regex": book_author, "$options": "i"}
+    return query
+
+
+
+# Fields a listing may ask for with fields=...; "all" returns whole documents
+BOOK_LIST_FIELDS = ("title", "author", "description", "edition", "quantity", "available", "category", "added_at")
+# What list views actually render
+BOOK_LIST_DEFAULT_FIELDS = ("title", "author", "edition", "available", "category")
+
+
+def parse_fields(fields: str | None) -> list[str] | None:
+    # None means no projection (full documents); raises ValueError on unknown names
+    if not fields:
+        return list(BOOK_LIST_DEFAULT_FIELDS)
+    if fields.strip() == "all":
+        return None
+    selected = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in selected if f not in BOOK_LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return selected
@@ -0,0 +1,134 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dotenv import load_dotenv
+
+from db_connection.redis_config import redis_client
+from utility.book_cache import invalidate_book
+from utility.responses import dumps
+
+load_dotenv()
+
+# Every cached catalog result is tagged with the catalog version it was
+# computed at. Admin writes bump the version, so old entries simply stop
+# matching and age out of the LRU: invalidation is O(1), no key scans.
+#
+# Versions are "{epoch}-{counter}". The epoch is created once per Redis
+# dataset, so after a flush the counters restart under a new epoch and tags
+# issued before it can never match again.
+CATALOG_VERSION_KEY = "catalog:version"
+CATALOG_EPOCH_KEY = "catalog:epoch"
+CATALOG_CACHE_MAX_ENTRIES = int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", 5000))
+CATALOG_CACHE_MAX_BYTES = int(os.getenv("CATALOG_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+# Backstop for a bump that failed (bump_catalog_version swallows Redis
+# errors): a page outlives a missed invalidation by at most this long
+CATALOG_CACHE_TTL = float(os.getenv("CATALOG_CACHE_TTL", 60))
+
+_pages = OrderedDict()      # (version, key) -> (expires_at, size, value)
+_bytes = 0
+_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+
+async def _read_version(counter_key: str) -> str | None:
+    try:
+        epoch, counter = await redis_client.mget([CATALOG_EPOCH_KEY, counter_key])
+        if epoch is None:
+            # First read after a flush (or ever): whoever wins SETNX sets the epoch
+            await redis_client.set(CATALOG_EPOCH_KEY, uuid.uuid4().hex[:12], nx=True)
+            epoch, counter = await redis_client.mget([CATALOG_EPOCH_KEY, counter_key])
+        return f"{epoch}-{int(counter or 0)}"
+    except Exception as e:
+        # No version means no safe way to validate entries, bypass the cache
+        print("Redis Get Error:", e)
+        return None
+
+
+async def get_catalog_version() -> str | None:
+    return await _read_version(CATALOG_VERSION_KEY)
+
+
+async def get_book_version(book_id: str) -> str | None:
+    return await _read_version(f"book:version:{book_id}")
+
+
+async def bump_catalog_version(*book_ids):
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.incr(CATALOG_VERSION_KEY)
+            for book_id in book_ids:
+                pipe.incr(f"book:version:{book_id}")
+            await pipe.execute()
+    except Exception as e:
+        print("Redis Incr Error:", e)
+
+
+async def catalog_changed(*book_ids):
+    # Call after any admin write that changes books or their availability
+    await invalidate_book(*book_ids)
+    await bump_catalog_version(*book_ids)
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # Weak comparison, as If-None-Match requires
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+def page_cache_key(params: dict) -> str:
+    normalized = json.dumps(params, sort_keys=True, default=str)
+    return hashlib.sha1(normalized.encode()).hexdigest()
+
+
+def get_page(version: str, key: str):
+    global _bytes
+    entry = _pages.get((version, key))
+    if entry is not None and time.monotonic() >= entry[0]:
+        del _pages[(version, key)]
+        _bytes -= entry[1]
+        entry = None
+    if entry is None:
+        _stats["misses"] += 1
+        return None
+    _pages.move_to_end((version, key))
+    _stats["hits"] += 1
+    return entry[2]
+
+
+def set_page(version: str, key: str, value):
+    global _bytes
+    size = len(dumps(value))
+    if size > CATALOG_CACHE_MAX_BYTES:
+        return
+
+    old = _pages.pop((version, key), None)
+    if old:
+        _bytes -= old[1]
+    _pages[(version, key)] = (time.monotonic() + CATALOG_CACHE_TTL, size, value)
+    _bytes += size
+
+    while len(_pages) > CATALOG_CACHE_MAX_ENTRIES or _bytes > CATALOG_CACHE_MAX_BYTES:
+        _, (_, evicted_size, _) = _pages.popitem(last=False)
+        _bytes -= evicted_size
+        _stats["evictions"] += 1
+
+
+def catalog_cache_stats() -> dict:
+    total = _stats["hits"] + _stats["misses"]
+    return {
+        "entries": len(_pages),
+        "max_entries": CATALOG_CACHE_MAX_ENTRIES,
+        "bytes": _bytes,
+        "max_bytes": CATALOG_CACHE_MAX_BYTES,
+        "ttl": CATALOG_CACHE_TTL,
+        "hits": _stats["hits"],
+        "misses": _stats["misses"],
+        "evictions": _stats["evictions"],
+        "hit_rate": round(_stats["hits"] / total, 4) if total else 0.0,
+    }
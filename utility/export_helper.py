@@ -0,0 +1,60 @@
+import csv
+import io
+import os
+import zlib
+from datetime import datetime
+from dotenv import load_dotenv
+
+from utility.responses import dumps
+
+load_dotenv()
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", 2000))
+EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _csv_value(value):
+    if isinstance(value, list):
+        return "|".join(str(v) for v in value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else str(value)
+
+
+async def _rows(cursor, export_format: str, columns: list[str] | None):
+    # Yields text chunks of roughly EXPORT_CHUNK_BYTES; one batch in memory at a time
+    buffer = io.StringIO()
+    writer = None
+    async for doc in cursor:
+        if export_format == "csv":
+            if writer is None:
+                # Without an explicit projection the first document decides the columns
+                columns = columns or list(doc.keys())
+                writer = csv.writer(buffer)
+                writer.writerow(columns)
+            writer.writerow([_csv_value(doc.get(col)) for col in columns])
+        else:
+            buffer.write(dumps(doc).decode())
+            buffer.write("\n")
+
+        if buffer.tell() >= EXPORT_CHUNK_BYTES:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+async def stream_export(cursor, export_format: str, columns: list[str] | None, gzip: bool):
+    if not gzip:
+        async for chunk in _rows(cursor, export_format, columns):
+            yield chunk.encode()
+        return
+
+    compressor = zlib.compressobj(wbits=31)   # gzip container
+    async for chunk in _rows(cursor, export_format, columns):
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
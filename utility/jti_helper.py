@@ -1,4 +1,5 @@
 import json
+import time
 from datetime import datetime, timedelta
 from uuid import uuid4
 
@@ -6,6 +7,16 @@ from db_connection.redis_config import redis_client
 
 # JTI expiration = same as refresh token expiration
 REFRESH_EXPIRE_DAYS = 30
+SESSION_TTL = REFRESH_EXPIRE_DAYS * 24 * 60 * 60
+
+# refresh:{jti} -> session json
+# session_index:{email} -> ZSET of jti scored by expiry (epoch seconds).
+# Every write first drops members whose score has passed, so sessions that
+# expire without a logout or rotation do not pile up in an active user's index.
+
+
+def _index_key(email: str) -> str:
+    return f"session_index:{email}"
 
 
 def generate_jti() -> str:
@@ -24,41 +35,97 @@ def create_session(email: str, role:str):
     }
 
 
-def save_jti(jti: str, session: dict):
-    redis_client.setex(
-        f"refresh:{jti}",
-        REFRESH_EXPIRE_DAYS * 24 * 60 * 60,  # TTL in seconds
-        json.dumps(session)
-    )
-
-
-def get_jti_session(jti: str) -> dict | None:
-    data = redis_client.get(f"refresh:{jti}")
-    return json.loads(data) if data else None
-
-
-def validate_jti(jti: str, email: str) -> bool:
-    session = get_jti_session(jti)
-    if not session:
-        return False
-    return session["email"] == email
-
-
-def delete_jti(jti: str):
-    redis_client.delete(f"refresh:{jti}")
-
-
-def rotate_jti(old_jti: str):
-    old_session = get_jti_session(old_jti)
-    if not old_session:
-        raise Exception("Old session missing")
-    role = old_session.get("role")
-    email = old_session.get("email")
-    delete_jti(old_jti)
+async def save_jti(jti: str, session: dict):
+    index_key = _index_key(session["email"])
+    now = time.time()
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.setex(f"refresh:{jti}", SESSION_TTL, json.dumps(session))
+        pipe.zremrangebyscore(index_key, "-inf", now)
+        pipe.zadd(index_key, {jti: now + SESSION_TTL})
+        pipe.expire(index_key, SESSION_TTL)
+        await pipe.execute()
+
+
+async def delete_jti(jti: str, email: str):
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.delete(f"refresh:{jti}")
+        pipe.zrem(_index_key(email), jti)
+        await pipe.execute()
+
+
+# Validate + rotate in one server-side step: the old session is checked
+# against the email, deleted and re-issued under the new jti atomically,
+# so two concurrent refreshes of the same token cannot both succeed.
+ROTATE_JTI_SCRIPT = """
+local data = redis.call('GET', KEYS[1])
+if not data then
+    return false
+end
+local session = cjson.decode(data)
+if session['email'] ~= ARGV[1] then
+    return false
+end
+redis.call('DEL', KEYS[1])
+session['created_at'] = ARGV[2]
+session['expires_at'] = ARGV[3]
+redis.call('SETEX', KEYS[2], ARGV[4], cjson.encode(session))
+redis.call('ZREM', KEYS[3], ARGV[5])
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', ARGV[7])
+redis.call('ZADD', KEYS[3], ARGV[8], ARGV[6])
+redis.call('EXPIRE', KEYS[3], ARGV[4])
+return session['role']
+"""
+_rotate_jti = redis_client.register_script(ROTATE_JTI_SCRIPT)
+
+
+async def rotate_jti(old_jti: str, email: str) -> tuple[str, str] | None:
     new_jti = generate_jti()
+    now = datetime.utcnow()
+    expires = now + timedelta(days=REFRESH_EXPIRE_DAYS)
+    epoch = time.time()
 
-    session = create_session(email, role)
-    save_jti(new_jti, session)
-
-    return new_jti
-
+    role = await _rotate_jti(
+        keys=[f"refresh:{old_jti}", f"refresh:{new_jti}", _index_key(email)],
+        args=[email, now.isoformat(), expires.isoformat(), SESSION_TTL, old_jti, new_jti,
+              epoch, epoch + SESSION_TTL],
+    )
+    if not role:
+        return None
+    return new_jti, role
+
+
+async def list_sessions(email: str) -> list[dict]:
+    index_key = _index_key(email)
+    async with redis_client.pipeline(transaction=True) as pipe:
+        pipe.zremrangebyscore(index_key, "-inf", time.time())
+        pipe.zrange(index_key, 0, -1)
+        _, jtis = await pipe.execute()
+    if not jtis:
+        return []
+
+    sessions, stale = [], []
+    for jti, data in zip(jtis, await redis_client.mget([f"refresh:{jti}" for jti in jtis])):
+        if data is None:
+            stale.append(jti)
+            continue
+        session = json.loads(data)
+        session["jti"] = jti
+        sessions.append(session)
+    if stale:
+        await redis_client.zrem(index_key, *stale)
+    return sessions
+
+
+async def revoke_all_sessions(email: str) -> int:
+    # Only the members read here are removed, so a login racing with the
+    # revoke keeps its fresh session indexed
+    index_key = _index_key(email)
+    jtis = await redis_client.zrange(index_key, 0, -1)
+    if not jtis:
+        return 0
+    async with redis_client.pipeline(transaction=False) as pipe:
+        for jti in jtis:
+            pipe.delete(f"refresh:{jti}")
+        pipe.zrem(index_key, *jtis)
+        await pipe.execute()
+    return len(jtis)
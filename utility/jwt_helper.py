@@ -1,7 +1,10 @@
 from jose import jwt, JWTError, ExpiredSignatureError
 from datetime import datetime, timedelta
+from collections import OrderedDict
 from uuid import uuid4
 from dotenv import load_dotenv
+import hashlib
+import time
 import os
 
 load_dotenv()
@@ -13,6 +16,12 @@ ALGORITHM = "HS256"
 ACCESS_EXPIRE_MINUTES = 15        # short-lived
 REFRESH_EXPIRE_DAYS = 30          # long-lived
 
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+
+# digest(token) -> (exp, payload); LRU order, oldest first
+_token_cache = OrderedDict()
+_token_cache_stats = {"hits": 0, "misses": 0, "evictions": 0}
+
 
 def create_access_token(email: str, role:str) -> str:
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_EXPIRE_MINUTES)
@@ -74,3 +83,42 @@ def verify_refresh_token(token: str):
     except JWTError:
         raise Exception("Invalid refresh token")
 
+
+def _token_digest(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def verify_access_token_cached(token: str):
+    key = _token_digest(token)
+    entry = _token_cache.get(key)
+    if entry is not None:
+        exp, payload = entry
+        if time.time() < exp:
+            _token_cache.move_to_end(key)
+            _token_cache_stats["hits"] += 1
+            return dict(payload)
+        # Past exp: drop it and let the full decode raise "Access token expired"
+        del _token_cache[key]
+
+    _token_cache_stats["misses"] += 1
+    payload = verify_access_token(token)
+
+    exp = payload.get("exp")
+    if exp:
+        _token_cache[key] = (exp, payload)
+        if len(_token_cache) > TOKEN_CACHE_SIZE:
+            _token_cache.popitem(last=False)
+            _token_cache_stats["evictions"] += 1
+    return dict(payload)
+
+
+def token_cache_stats() -> dict:
+    total = _token_cache_stats["hits"] + _token_cache_stats["misses"]
+    return {
+        "size": len(_token_cache),
+        "max_size": TOKEN_CACHE_SIZE,
+        "hits": _token_cache_stats["hits"],
+        "misses": _token_cache_stats["misses"],
+        "evictions": _token_cache_stats["evictions"],
+        "hit_rate": round(_token_cache_stats["hits"] / total, 4) if total else 0.0,
+    }
@@ -0,0 +1,111 @@
+"""
+Incrementally maintained dashboard counters.
+
+    library_stats {_id: "global", total_books, issued_books, pending_requests}
+    library_stats {_id: "month:YYYY-MM", books_added}
+
+Write paths $inc these right after their own write. Drift (crashes between
+the two writes, manual edits) is repaired by rebuilding from scratch:
+
+    python -m utility.library_stats rebuild   # always
+    python -m utility.library_stats ensure    # only if never rebuilt
+"""
+import asyncio
+import sys
+from datetime import datetime
+from pymongo import ReplaceOne
+
+STATS_ID = "global"
+
+# Statuses that count as a book out of the library
+ISSUED_STATUSES = ["renew_rejected", "renew_requested", "return_requested", "approved", "renewed"]
+
+
+def month_key(when: datetime) -> str:
+    return f"month:{when:%Y-%m}"
+
+
+async def inc_stats(db, **fields):
+    if fields:
+        await db.library_stats.update_one({"_id": STATS_ID}, {"$inc": fields}, upsert=True)
+
+
+async def inc_month(db, when: datetime | None, books_added: int):
+    if when is None:
+        return
+    await db.library_stats.update_one({"_id": month_key(when)}, {"$inc": {"books_added": books_added}}, upsert=True)
+
+
+async def read_stats(db, months: list[datetime]) -> dict:
+    # Global document plus the requested month buckets in one indexed _id lookup
+    keys = [month_key(m) for m in months]
+    docs = await db.library_stats.find({"_id": {"$in": [STATS_ID, *keys]}}).to_list(len(keys) + 1)
+    by_id = {doc["_id"]: doc for doc in docs}
+    stats = by_id.get(STATS_ID, {})
+    return {
+        "total_books": stats.get("total_books", 0),
+        "issued_books": stats.get("issued_books", 0),
+        "pending_requests": stats.get("pending_requests", 0),
+        "books_added": [by_id.get(key, {}).get("books_added", 0) for key in keys],
+    }
+
+
+async def rebuild_stats(db):
+    total_books, issued_books, pending_requests, months = await asyncio.gather(
+        db.books.count_documents({}),
+        db.issued_books.count_documents({"status": {"$in": ISSUED_STATUSES}}),
+        db.issued_books.count_documents({"status": "requested"}),
+        db.books.aggregate([
+            {"$match": {"added_at": {"$type": "date"}}},
+            {"$group": {
+                "_id": {"$dateToString": {"format": "month:%Y-%m", "date": "$added_at"}},
+                "books_added": {"$sum": 1},
+            }},
+        ]).to_list(None),
+    )
+
+    # Replace in place rather than drop + insert, so $inc upserts racing
+    # with the rebuild never hit a duplicate key
+    await db.library_stats.replace_one({"_id": STATS_ID}, {
+        "total_books": total_books,
+        "issued_books": issued_books,
+        "pending_requests": pending_requests,
+        "rebuilt_at": datetime.utcnow(),
+    }, upsert=True)
+    month_ids = [month["_id"] for month in months]
+    await db.library_stats.delete_many({"_id": {"$regex": "^month:", "$nin": month_ids}})
+    if months:
+        await db.library_stats.bulk_write([ReplaceOne({"_id": m["_id"]}, m, upsert=True) for m in months])
+    print(f"Library stats rebuilt: {total_books} books, {issued_books} issued, {len(months)} month buckets")
+
+
+async def ensure_library_stats(db):
+    # Decided on the rebuild marker, not on the document existing: an $inc
+    # upsert from a write path can create a partial document first
+    try:
+        if not await db.library_stats.find_one({"_id": STATS_ID, "rebuilt_at": {"$exists": True}}):
+            await rebuild_stats(db)
+    except Exception as e:
+        print("Library Stats Error:", e)
+
+
+async def _cli(command: str):
+    from db_connection.db_config import MONGO_URI, MONGO_DB
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(MONGO_URI)
+    try:
+        if command == "rebuild":
+            await rebuild_stats(client[MONGO_DB])
+        elif command == "ensure":
+            await ensure_library_stats(client[MONGO_DB])
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    if command not in ("rebuild", "ensure"):
+        print(__doc__)
+        sys.exit(2)
+    asyncio.run(_cli(command))
@@ -0,0 +1,44 @@
+import base64
+from bson import ObjectId, json_util
+
+
+# Opaque keyset cursors: base64url of {"s": sort field, "o": order, "v": last
+# sort value, "id": last _id}. bson.json_util keeps ObjectId/datetime types
+# intact across the round trip. _id is always the tiebreak, in the same
+# direction as the sort field, so one {field, _id} index serves both orders.
+
+def encode_cursor(sort_by: str, order: str, last_doc: dict) -> str:
+    payload = {"s": sort_by, "o": order, "v": last_doc.get(sort_by), "id": last_doc["_id"]}
+    raw = json_util.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort_by: str, order: str) -> dict | None:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        return None
+    # A cursor is only valid for the ordering it was produced under
+    if not isinstance(payload, dict) or payload.get("s") != sort_by or payload.get("o") != order:
+        return None
+    if not isinstance(payload.get("id"), ObjectId):
+        return None
+    return payload
+
+
+def keyset_filter(sort_by: str, order: str, last_value, last_id: ObjectId) -> dict:
+    op = "$gt" if order == "asc" else "$lt"
+    if sort_by == "_id":
+        return {"_id": {op: last_id}}
+    return {"$or": [
+        {sort_by: {op: last_value}},
+        {sort_by: last_value, "_id": {op: last_id}},
+    ]}
+
+
+def sort_spec(sort_by: str, order: str) -> list:
+    direction = 1 if order == "asc" else -1
+    if sort_by == "_id":
+        return [("_id", direction)]
+    return [(sort_by, direction), ("_id", direction)]
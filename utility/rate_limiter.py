@@ -0,0 +1,101 @@
+import os
+import time
+from uuid import uuid4
+from fastapi import HTTPException, Request
+from dotenv import load_dotenv
+
+from db_connection.redis_config import redis_client
+
+load_dotenv()
+
+# action -> (per ip limit, per email limit, window seconds)
+RATE_LIMITS = {
+    "login": (
+        int(os.getenv("LOGIN_RATE_LIMIT_IP", 30)),
+        int(os.getenv("LOGIN_RATE_LIMIT_EMAIL", 10)),
+        int(os.getenv("LOGIN_RATE_WINDOW", 60)),
+    ),
+    "signup": (
+        int(os.getenv("SIGNUP_RATE_LIMIT_IP", 10)),
+        int(os.getenv("SIGNUP_RATE_LIMIT_EMAIL", 3)),
+        int(os.getenv("SIGNUP_RATE_WINDOW", 300)),
+    ),
+}
+
+# In-process pre-filter: a per-ip burst cap per second that rejects obvious
+# floods before they cost a Redis round trip
+LOCAL_BURST_PER_SECOND = int(os.getenv("RATE_LIMIT_LOCAL_BURST", 20))
+LOCAL_MAX_KEYS = 10000
+TRUST_PROXY_HEADERS = os.getenv("TRUST_PROXY_HEADERS", "false").lower() == "true"
+_local_hits = {}    # ip -> (second, count)
+
+
+# Sliding window over sorted sets. Every key is checked first and the
+# request is only recorded when all of them are under their limit.
+# Returns {allowed, retry_after_ms}.
+SLIDING_WINDOW_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local member = ARGV[3]
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[3 + i]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local wait = tonumber(oldest[2]) + window - now
+        if wait > retry_after then
+            retry_after = wait
+        end
+    end
+end
+if retry_after > 0 then
+    return {0, retry_after}
+end
+for _, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, member)
+    redis.call('PEXPIRE', key, window)
+end
+return {1, 0}
+"""
+_sliding_window = redis_client.register_script(SLIDING_WINDOW_SCRIPT)
+
+
+def get_client_ip(request: Request) -> str:
+    forwarded = request.headers.get("x-forwarded-for")
+    if TRUST_PROXY_HEADERS and forwarded:
+        return forwarded.split(",")[0].strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _local_check(ip: str) -> bool:
+    second = int(time.time())
+    last_second, count = _local_hits.get(ip, (second, 0))
+    if last_second != second:
+        count = 0
+    if count >= LOCAL_BURST_PER_SECOND:
+        return False
+    if len(_local_hits) >= LOCAL_MAX_KEYS and ip not in _local_hits:
+        _local_hits.clear()
+    _local_hits[ip] = (second, count + 1)
+    return True
+
+
+async def enforce_rate_limit(request: Request, action: str, email: str):
+    ip = get_client_ip(request)
+    if not _local_check(ip):
+        raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": "1"})
+
+    ip_limit, email_limit, window = RATE_LIMITS[action]
+    try:
+        allowed, retry_after_ms = await _sliding_window(
+            keys=[f"rl:{action}:ip:{ip}", f"rl:{action}:email:{email.lower()}"],
+            args=[int(time.time() * 1000), window * 1000, uuid4().hex, ip_limit, email_limit],
+        )
+    except Exception as e:
+        # Fail open: a Redis outage should not lock everyone out
+        print("Rate Limit Error:", e)
+        return
+
+    if not int(allowed):
+        retry_after = max(1, int(retry_after_ms) // 1000 + 1)
+        raise HTTPException(status_code=429, detail="Too many requests", headers={"Retry-After": str(retry_after)})
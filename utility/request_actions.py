@@ -0,0 +1,201 @@
+import asyncio
+import os
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from bson import ObjectId
+from dotenv import load_dotenv
+from pymongo import UpdateOne
+
+from utility.catalog_cache import catalog_changed
+from utility.library_stats import inc_stats
+
+load_dotenv()
+
+BULK_MAX_ITEMS = int(os.getenv("BULK_MAX_ITEMS", 500))
+LOAN_DAYS = 3
+
+# action -> status the request must be in, change to `available`, stats deltas
+TRANSITIONS = {
+    "approved": {"from": "requested", "available": -1, "stats": {"pending_requests": -1, "issued_books": 1}},
+    "rejected": {"from": "requested", "available": 0, "stats": {"pending_requests": -1}},
+    "renewed": {"from": "renew_requested", "available": 0, "stats": {}},
+    "renew_rejected": {"from": "renew_requested", "available": 0, "stats": {}},
+    "returned": {"from": "return_requested", "available": 1, "stats": {"issued_books": -1}},
+}
+
+
+def _update_for(action: str, issued: dict, now: datetime) -> dict:
+    # Same fields the single-item endpoints write, plus processed_at for reconciliation
+    fields = {"status": action, "processed_at": now}
+    if action in ("approved", "rejected"):
+        fields.update({"issue_date": now, "return_date": now + timedelta(days=LOAN_DAYS)})
+    elif action == "renewed":
+        fields["return_date"] = issued["return_date"] + timedelta(days=LOAN_DAYS)
+    elif action == "returned":
+        fields.update({"return_date": now, "previous_status": None})
+    return {"$set": fields}
+
+
+async def _release_reservations(db, approvals: dict, reserved: dict, now: datetime):
+    # Give back the copies reserved for approvals that did not land. Rows this
+    # batch already stamped keep theirs; if even that read fails, assume none did.
+    try:
+        ids = [oid for book_id in reserved for oid, _, _ in approvals[book_id]]
+        stamped = await db.issued_books.find({"_id": {"$in": ids}, "processed_at": now}, {"_id": 1}).to_list(len(ids))
+        stamped = {doc["_id"] for doc in stamped}
+    except Exception as e:
+        print("Bulk Actions Reconcile Error:", e)
+        stamped = set()
+
+    release = {}
+    for book_id, count in reserved.items():
+        unused = count - sum(1 for oid, _, _ in approvals[book_id] if oid in stamped)
+        if unused:
+            release[book_id] = unused
+    if not release:
+        return
+    try:
+        await db.books.bulk_write(
+            [UpdateOne({"_id": book_id}, {"$inc": {"available": count}}) for book_id, count in release.items()],
+            ordered=False
+        )
+        await catalog_changed(*release)
+    except Exception as e:
+        print("Bulk Actions Release Error:", e)
+
+
+async def apply_request_actions(db, items: list) -> list:
+    """
+    Applies [(request_id, action), ...] in a fixed number of round trips:
+    one read of every request, one read of the books being issued, one
+    conditional stock reservation per issued book (sent concurrently), one
+    bulk_write on issued_books and at most one on books. Returns one result
+    dict per item, in order.
+    """
+    results = [{"request_id": request_id, "action": action, "status": "failed", "message": ""} for request_id, action in items]
+
+    # 🔹 Shape checks, no database needed
+    pending = {}    # ObjectId -> index into results
+    for i, (request_id, action) in enumerate(items):
+        if action not in TRANSITIONS:
+            results[i]["message"] = f"Action must be one of {', '.join(TRANSITIONS)}"
+        elif not ObjectId.is_valid(request_id):
+            results[i]["message"] = "Invalid request ID"
+        elif ObjectId(request_id) in pending:
+            results[i]["message"] = "Duplicate request ID"
+        else:
+            pending[ObjectId(request_id)] = i
+    if not pending:
+        return results
+
+    # 🔹 State transitions validated against one read
+    issued = await db.issued_books.find(
+        {"_id": {"$in": list(pending)}},
+        {"status": 1, "book_id": 1, "return_date": 1}
+    ).to_list(len(pending))
+    issued = {doc["_id"]: doc for doc in issued}
+
+    valid = []
+    for oid, i in pending.items():
+        action = items[i][1]
+        doc = issued.get(oid)
+        if not doc:
+            results[i]["message"] = "Request not found"
+        elif doc["status"] != TRANSITIONS[action]["from"]:
+            results[i]["message"] = f"Request is {doc['status']}, expected {TRANSITIONS[action]['from']}"
+        elif action == "renewed" and not doc.get("return_date"):
+            results[i]["message"] = "Request has no return date to extend"
+        else:
+            valid.append((oid, i, doc))
+
+    # 🔹 Approvals draw down each book's stock in request order
+    issuing = {doc["book_id"] for _, i, doc in valid if items[i][1] == "approved"}
+    stock = {}
+    if issuing:
+        books = await db.books.find({"_id": {"$in": list(issuing)}}, {"available": 1}).to_list(len(issuing))
+        stock = {book["_id"]: book.get("available", 0) for book in books}
+
+    now = datetime.now(timezone.utc)
+    approvals = defaultdict(list)   # book_id -> entries being issued from it
+    planned = []
+    for oid, i, doc in valid:
+        if items[i][1] == "approved":
+            if stock.get(doc["book_id"], 0) <= 0:
+                results[i]["message"] = "Book not available for issuing"
+                continue
+            stock[doc["book_id"]] -= 1
+            approvals[doc["book_id"]].append((oid, i, doc))
+        planned.append((oid, i, doc))
+
+    # 🔹 Reserve stock before touching the requests. The filter re-checks
+    # `available`, so an approval that ran since the read above cannot push
+    # it below zero; a book that no longer has enough fails its approvals.
+    reserved = {}
+    if approvals:
+        book_ids = list(approvals)
+        outcomes = await asyncio.gather(*[
+            db.books.update_one(
+                {"_id": book_id, "available": {"$gte": len(approvals[book_id])}},
+                {"$inc": {"available": -len(approvals[book_id])}}
+            )
+            for book_id in book_ids
+        ])
+        for book_id, outcome in zip(book_ids, outcomes):
+            if outcome.matched_count:
+                reserved[book_id] = len(approvals[book_id])
+                continue
+            for oid, i, _ in approvals[book_id]:
+                results[i]["message"] = "Book not available for issuing"
+            planned = [entry for entry in planned if entry not in approvals[book_id]]
+    if not planned:
+        return results
+
+    try:
+        # The status in the filter guards against a concurrent change since the read
+        outcome = await db.issued_books.bulk_write(
+            [UpdateOne({"_id": oid, "status": TRANSITIONS[items[i][1]]["from"]}, _update_for(items[i][1], doc, now))
+             for oid, i, doc in planned],
+            ordered=False
+        )
+        applied = planned
+        if outcome.matched_count != len(planned):
+            # Some rows moved under us; only those stamped by this batch count
+            stamped = await db.issued_books.find(
+                {"_id": {"$in": [oid for oid, _, _ in planned]}, "processed_at": now}, {"_id": 1}
+            ).to_list(len(planned))
+            stamped = {doc["_id"] for doc in stamped}
+            applied = [entry for entry in planned if entry[0] in stamped]
+            for oid, i, _ in planned:
+                if oid not in stamped:
+                    results[i]["message"] = "Request changed while processing"
+    except Exception:
+        # Nothing past this point would release the reservation
+        await _release_reservations(db, approvals, reserved, now)
+        raise
+
+    # 🔹 Remaining stock changes, one $inc per book: returns put copies back,
+    # and approvals that did not apply release their reservation
+    net = defaultdict(int)
+    stats = Counter()
+    for _, i, doc in applied:
+        action = items[i][1]
+        results[i].update({"status": "success", "message": f"Request {action}"})
+        net[doc["book_id"]] += TRANSITIONS[action]["available"]
+        stats.update(TRANSITIONS[action]["stats"])
+
+    # Reserved books already carry their full decrement
+    adjustments = {}
+    for book_id in set(net) | set(reserved):
+        delta = net[book_id] + reserved.get(book_id, 0)
+        if delta:
+            adjustments[book_id] = delta
+    if adjustments:
+        await db.books.bulk_write(
+            [UpdateOne({"_id": book_id}, {"$inc": {"available": delta}}) for book_id, delta in adjustments.items()],
+            ordered=False
+        )
+    changed = list(set(reserved) | set(adjustments))
+    if changed:
+        await catalog_changed(*changed)
+    await inc_stats(db, **{field: delta for field, delta in stats.items() if delta})
+    return results
@@ -0,0 +1,99 @@
+from utility.pagination import encode_cursor, decode_cursor, keyset_filter, sort_spec
+
+QUEUE_FIELDS = {"id", "student_email", "book_title", "book_author", "issue_date", "return_date", "request_date", "status"}
+
+# Admin queues over issued_books: status -> the date the queue is ordered by.
+# Oldest first, so a page walk processes requests in arrival order.
+QUEUES = {
+    "requested": {"status": "requested", "date_field": "request_date"},
+    # request_date would only repeat issue_date here, so it is opt-in via ?fields=
+    "issued": {"status": "approved", "date_field": "issue_date", "default_fields": QUEUE_FIELDS - {"request_date"}},
+    "renew": {"status": "renew_requested", "date_field": "renew_request_date"},
+    "return": {"status": "return_requested", "date_field": "return_request_date"},
+}
+
+
+def parse_queue_fields(queue: str, fields: str | None) -> set:
+    # None means the queue's default fields; raises ValueError on unknown names
+    if not fields:
+        return QUEUES[queue].get("default_fields", QUEUE_FIELDS)
+    requested = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = requested - QUEUE_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested
+
+
+def _keyset(date_field: str, parsed: dict) -> dict:
+    # Rows without a date sort first; $gt null matches nothing, so step past them explicitly
+    if parsed["v"] is None:
+        return {"$or": [
+            {date_field: {"$ne": None}},
+            {date_field: None, "_id": {"$gt": parsed["id"]}},
+        ]}
+    return keyset_filter(date_field, "asc", parsed["v"], parsed["id"])
+
+
+def queue_pipeline(queue: str, keyset: dict, limit: int, email: str | None, fields: set) -> list:
+    spec = QUEUES[queue]
+    date_field = spec["date_field"]
+    match = {"status": spec["status"], **keyset}
+    if email:
+        match["email"] = email
+
+    projection = {
+        "id": "$_id",
+        "student_email": "$email",
+        "book_title": "$book.title",
+        "book_author": "$book.author",
+        "issue_date": 1,
+        "return_date": 1,
+        "request_date": f"${date_field}",
+        "status": 1,
+    }
+    projection = {key: value for key, value in projection.items() if key in fields}
+    # The cursor needs the sort key and _id whatever the caller asked for
+    projection.update({"_id": 1, "_sort": f"${date_field}"})
+
+    return [
+        {"$match": match},
+        {"$sort": dict(sort_spec(date_field, "asc"))},
+        {"$lookup": {
+            "from": "books",
+            "localField": "book_id",
+            "foreignField": "_id",
+            "pipeline": [{"$project": {"title": 1, "author": 1}}],
+            "as": "book",
+        }},
+        # Requests whose book was deleted are skipped, as before
+        {"$unwind": "$book"},
+        {"$limit": limit + 1},
+        {"$project": projection},
+    ]
+
+
+async def fetch_queue(db, queue: str, cursor: str | None, limit: int, email: str | None = None, fields: set = QUEUE_FIELDS):
+    """
+    One page of an admin queue with the book joined server side.
+    Returns (rows, next_cursor, has_more); raises ValueError on a bad cursor.
+    """
+    date_field = QUEUES[queue]["date_field"]
+    keyset = {}
+    if cursor:
+        parsed = decode_cursor(cursor, date_field, "asc")
+        if parsed is None:
+            raise ValueError("Invalid cursor")
+        keyset = _keyset(date_field, parsed)
+
+    rows = await db.issued_books.aggregate(queue_pipeline(queue, keyset, limit, email, fields)).to_list(limit + 1)
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(date_field, "asc", {date_field: last.get("_sort"), "_id": last["_id"]})
+    for row in rows:
+        del row["_id"]
+        row.pop("_sort", None)
+    return rows, next_cursor, has_more
@@ -0,0 +1,38 @@
+import asyncio
+
+_inflight = {}      # key -> Future of the load currently running for it
+
+
+async def single_flight(key, loader):
+    """
+    Run `loader()` once per key at a time; concurrent callers for the same
+    key await the same result instead of starting their own load.
+    """
+    while (future := _inflight.get(key)) is not None:
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Only the leader was cancelled (its client went away): retry, and
+            # lead the next load if nobody else got there first. Our own
+            # cancellation still propagates.
+            task = asyncio.current_task()
+            if not future.cancelled() or (task is not None and task.cancelling()):
+                raise
+
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    try:
+        result = await loader()
+        future.set_result(result)
+        return result
+    except Exception as e:
+        future.set_exception(e)
+        # Waiters get the exception; mark it retrieved so it is not logged twice
+        future.exception()
+        raise
+    finally:
+        # Leader cancelled (client disconnect, wait_for, shutdown): release
+        # the followers instead of leaving them on a future nobody completes
+        if not future.done():
+            future.cancel()
+        _inflight.pop(key, None)
@@ -1,13 +1,12 @@
 import secrets
-from db_connection.redis_config import redis_client
+from db_connection.redis_function import save_pending_signup, get_pending_email
 
-def generate_otp_context_token(email:str):
+async def generate_otp_context_token(email:str, otp:str, password:str):
     token = secrets.token_urlsafe(32)
-    redis_client.setex(f"otp_ctx:{token}",180, email)
+    if not await save_pending_signup(token, email, otp, password):
+        raise Exception("Failed to save pending signup")
     return token
 
-def get_email_url(token:str):
-    email = redis_client.get(f"otp_ctx:{token}")
+async def get_email_url(token:str):
+    email = await get_pending_email(token)
     return email
-
-